@@ -1,44 +1,113 @@
 """
-Minimal LangGraph/LangChain prototype with a single OpenAI node.
+Minimal LangGraph/LangChain prototype that fans one prompt out to several models.
 
 Flow:
 - parse free-form input (company/product/etc.)
 - build a shared prompt
-- call one OpenAI model (via OpenRouter) and show its output.
+- call every model (via OpenRouter) in parallel sibling nodes; each answer lands
+  under its model id in `outputs`
+- a join node waits for all of them and merges the answers into `combined`.
+  Each model has its own timeout, so one slow provider cannot hold up the rest:
+  wall-clock time is about the slowest model's, not the sum.
 
 CLI examples:
   python -m agents.fanout --input-text "Company: ...\nProduct: ..." --run
   python -m agents.fanout --input-file path/to/block.txt --run
+  python -m agents.fanout --run --models openai/gpt-4.1-mini anthropic/claude-sonnet-4 \
+      x-ai/grok-3 google/gemini-2.5-pro mistralai/mistral-large
+  python -m agents.fanout --run --stream # print tokens as they arrive
   python -m agents.fanout                # view parsed input + prompt only
+
+Batch mode (many product blocks, a few in flight at a time):
+  python -m agents.fanout --batch blocks/ --data-dir agents/scripts/data --run
+  python -m agents.fanout --batch blocks.jsonl --concurrency 8 --results runs.jsonl --run
+- A directory holds one block per `*.txt` file; the file stem names the vendor folder.
+- A JSONL file holds {"vendor": "...", "text": "..."} per line ("input_text" and
+  "id" are accepted too).
+- Each finished state is appended to --results as soon as it completes, and the
+  merged answer goes to <data-dir>/<vendor>/original sources.txt for the dedup
+  scripts. An existing file (often hand-merged) is never replaced: the answer is
+  appended as a new `---` section, which the incremental dedup picks up as a tail,
+  and skipped if that exact text is already in it. Without --run, only the plan
+  (block -> folder, and which folders already have the file) is printed.
+
+Answers are cached on disk (agents/llm_cache.py, `.fanout_cache.sqlite`) keyed by
+model id, system prompt, prompt and sampling parameters, so unchanged blocks cost
+nothing on re-runs. --refresh re-asks and overwrites; --no-cache bypasses it.
+
+Importing this module is cheap and needs no API key: the graph (`get_graph()`, or
+the module attribute `GRAPH`), the model clients and the langchain/langgraph/dotenv
+imports are all created on first use. `python -m agents.import_time` measures the
+import and fails if it gets slow again.
 """
 
 from __future__ import annotations
 
 import argparse
 import asyncio
+import json
 import os
+import re
 import textwrap
-from typing import Any, Dict, TypedDict
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    Sequence,
+    Tuple,
+    TypedDict,
+)
 
-from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langgraph.constants import END
-from langgraph.graph import StateGraph
+from agents.llm_cache import (
+    CACHE_FILE_NAME,
+    DEFAULT_MAX_BYTES,
+    DEFAULT_TTL_SECONDS,
+    LLMCache,
+    cache_key,
+)
 
-load_dotenv()
-OPENROUTER_API_KEY = os.getenv("openrouter_api_key")
+# langchain_openai / langgraph / dotenv are imported where first needed, so importing
+# this module (dry runs, batch planning, reuse in tests) stays fast and needs no key.
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
 
 SYSTEM_PROMPT = (
     "You are a precise research assistant. Return concise bullet lists with real URLs whenever "
     "possible."
 )
+DEFAULT_MODELS = ("openai/gpt-4.1-mini",)
+# Sampling parameters sent with every request (part of the cache key).
+SAMPLING_PARAMS = {"temperature": 0.2}
+# Run metadata key naming the model behind each streamed token.
+MODEL_METADATA_KEY = "fanout_model"
+# Seconds one model may take, retries included, before its answer is given up.
+MODEL_TIMEOUT = 120.0
+# Blocks run at the same time in batch mode (each one queries every model).
+BATCH_CONCURRENCY = 4
+# File the merged answers are written to in each vendor folder (read by the dedup scripts).
+SOURCES_NAME = "original sources.txt"
+
+
+def merge_dicts(left: Dict[str, Any] | None, right: Dict[str, Any] | None) -> Dict[str, Any]:
+    """State reducer: parallel model nodes each add their own key to the same dict."""
+    return {**(left or {}), **(right or {})}
 
 
 class GraphState(TypedDict, total=False):
     input_text: str
     meta: Dict[str, Any]
     prompt: str
-    openai_output: str
+    outputs: Annotated[Dict[str, str], merge_dicts]  # model id -> answer (or error text)
+    errors: Annotated[Dict[str, str], merge_dicts]  # model id -> error, for failed models
+    timings: Annotated[Dict[str, float], merge_dicts]  # model id -> seconds
+    cached: Annotated[Dict[str, bool], merge_dicts]  # model id -> answered from the cache
+    combined: str
 
 
 def parse_input(raw: str) -> Dict[str, Any]:
@@ -91,14 +160,26 @@ def build_prompt(meta: Dict[str, Any]) -> str:
     ).strip()
 
 
+@lru_cache(maxsize=None)
+def openrouter_api_key() -> str | None:
+    """OpenRouter key from the environment or .env, read on first use."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    return os.getenv("openrouter_api_key")
+
+
 def _make_llm(model_id: str) -> ChatOpenAI:
-    if not OPENROUTER_API_KEY:
+    api_key = openrouter_api_key()
+    if not api_key:
         raise RuntimeError("Missing openrouter_api_key in environment or .env")
+    from langchain_openai import ChatOpenAI
+
     return ChatOpenAI(
         model=model_id,
         base_url="https://openrouter.ai/api/v1",
-        api_key=OPENROUTER_API_KEY,
-        temperature=0.2,
+        api_key=api_key,
+        **SAMPLING_PARAMS,
         timeout=90,
         max_retries=2,
         default_headers={
@@ -108,6 +189,13 @@ def _make_llm(model_id: str) -> ChatOpenAI:
     )
 
 
+@lru_cache(maxsize=None)
+def _client(model_id: str):
+    """Client for one model, created on its first call and shared by every graph."""
+    # The metadata rides along with streamed tokens, so stream_single can tell models apart.
+    return _make_llm(model_id).with_config(metadata={MODEL_METADATA_KEY: model_id})
+
+
 # LangGraph nodes
 async def node_parse(state: GraphState) -> GraphState:
     return {"meta": parse_input(state["input_text"])}
@@ -117,39 +205,244 @@ async def node_prompt(state: GraphState) -> GraphState:
     return {"prompt": build_prompt(state["meta"])}
 
 
-def node_openai(model_id: str = "openai/gpt-4.1-mini"):
-    llm = _make_llm(model_id)
+def node_openai(
+    model_id: str = DEFAULT_MODELS[0],
+    timeout: float = MODEL_TIMEOUT,
+    cache: LLMCache | None = None,
+):
+    """Node calling one model through OpenRouter's OpenAI-compatible API (via `cache` if given)."""
 
     async def _node(state: GraphState) -> GraphState:
+        start = time.perf_counter()
+        key = cache_key(model_id, SYSTEM_PROMPT, state["prompt"], SAMPLING_PARAMS)
+        if cache is not None and (content := cache.get(key)) is not None:
+            return {
+                "outputs": {model_id: content},
+                "timings": {model_id: round(time.perf_counter() - start, 2)},
+                "cached": {model_id: True},
+            }
+        error = None
         try:
-            resp = await llm.ainvoke([("system", SYSTEM_PROMPT), ("user", state["prompt"])])
+            llm = _client(model_id)  # a missing key surfaces here, as this model's error
+            resp = await asyncio.wait_for(
+                llm.ainvoke([("system", SYSTEM_PROMPT), ("user", state["prompt"])]), timeout
+            )
             content = resp.content if hasattr(resp, "content") else str(resp)
+        except asyncio.TimeoutError:
+            error = f"no answer within {timeout:g}s"
+            content = f"[timeout] {error}"
         except Exception as exc:  # noqa: BLE001
-            content = f"[error] {type(exc).__name__}: {exc}"
-        return {"openai_output": content}
+            error = f"{type(exc).__name__}: {exc}"
+            content = f"[error] {error}"
+        update: GraphState = {
+            "outputs": {model_id: content},
+            "timings": {model_id: round(time.perf_counter() - start, 2)},
+            "cached": {model_id: False},
+        }
+        if error:
+            update["errors"] = {model_id: error}
+        elif cache is not None:
+            cache.put(key, model_id, content)  # errors and timeouts are never cached
+        return update
+
+    return _node
+
+
+def node_join(models: Sequence[str]):
+    """Node run once every model node has finished: merge answers in model order."""
+
+    async def _node(state: GraphState) -> GraphState:
+        outputs = state.get("outputs", {})
+        errors = state.get("errors", {})
+        sections = [f"# {model}\n\n{outputs[model]}" for model in models if model not in errors]
+        return {"combined": "\n\n".join(sections)}
 
     return _node
 
 
-def build_graph():
+def model_node_name(model_id: str) -> str:
+    """Graph node name for a model id (`:` and `|` are reserved by LangGraph)."""
+    return "model_" + re.sub(r"[^A-Za-z0-9_.-]", "_", model_id)
+
+
+def build_graph(
+    models: Sequence[str] = DEFAULT_MODELS,
+    timeout: float = MODEL_TIMEOUT,
+    cache: LLMCache | None = None,
+):
+    """parse -> prompt -> one node per model (in parallel) -> join."""
+    from langgraph.constants import END
+    from langgraph.graph import StateGraph
+
+    models = list(dict.fromkeys(models))  # drop repeats, keep order
+    if not models:
+        raise ValueError("build_graph needs at least one model id")
     graph = StateGraph(GraphState)
     graph.add_node("parse", node_parse)
     graph.add_node("prompt", node_prompt)
-    graph.add_node("openai", node_openai())
+    graph.add_node("join", node_join(models))
 
     graph.set_entry_point("parse")
     graph.add_edge("parse", "prompt")
-    graph.add_edge("prompt", "openai")
-    graph.add_edge("openai", END)
+    model_nodes: List[str] = []
+    for model_id in models:
+        name = model_node_name(model_id)
+        graph.add_node(name, node_openai(model_id, timeout, cache))
+        graph.add_edge("prompt", name)  # siblings run in the same step, concurrently
+        model_nodes.append(name)
+    graph.add_edge(model_nodes, "join")  # join waits for every model node
+    graph.add_edge("join", END)
     return graph.compile()
 
 
-GRAPH = build_graph()
-
-
-async def run_single(raw_text: str) -> Dict[str, Any]:
-    """Run the graph end-to-end and return state."""
-    return await GRAPH.ainvoke({"input_text": raw_text})
+@lru_cache(maxsize=None)
+def get_graph(
+    models: Tuple[str, ...] = DEFAULT_MODELS,
+    timeout: float = MODEL_TIMEOUT,
+    cache: LLMCache | None = None,
+):
+    """build_graph(...) compiled on first use and reused for the same arguments."""
+    return build_graph(models, timeout, cache)
+
+
+def __getattr__(name: str):
+    # `GRAPH` (the default graph) is built on first access rather than at import.
+    if name == "GRAPH":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+async def run_single(raw_text: str, graph=None) -> Dict[str, Any]:
+    """Run the graph (default: get_graph()) end-to-end and return state."""
+    return await (graph or get_graph()).ainvoke({"input_text": raw_text})
+
+
+async def stream_single(raw_text: str, graph=None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the graph like run_single, yielding events as they happen:
+    - {"type": "token", "model": id, "text": piece} for every token a model streams;
+    - {"type": "answer", "model": id, "text": answer, "cached": bool, "error": str | None}
+      when a model node finishes (cached answers only arrive this way);
+    - {"type": "done", "state": final state} last.
+    """
+    state: Dict[str, Any] = {}
+    async for mode, payload in (graph or get_graph()).astream(
+        {"input_text": raw_text}, stream_mode=["messages", "updates", "values"]
+    ):
+        if mode == "messages":
+            chunk, metadata = payload
+            model = metadata.get(MODEL_METADATA_KEY)
+            if model and isinstance(chunk.content, str) and chunk.content:
+                yield {"type": "token", "model": model, "text": chunk.content}
+        elif mode == "updates":
+            for update in payload.values():
+                update = update or {}
+                for model, text in update.get("outputs", {}).items():
+                    yield {
+                        "type": "answer",
+                        "model": model,
+                        "text": text,
+                        "cached": update.get("cached", {}).get(model, False),
+                        "error": update.get("errors", {}).get(model),
+                    }
+        else:
+            state = payload  # full state after each step; the last one is final
+    yield {"type": "done", "state": state}
+
+
+def load_blocks(path: Path) -> List[Tuple[str, str]]:
+    """(vendor folder name, block text) pairs from a directory of .txt files or a JSONL file."""
+    if path.is_dir():
+        return [(f.stem, f.read_text(encoding="utf-8")) for f in sorted(path.glob("*.txt"))]
+    blocks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            text = record.get("text") or record.get("input_text")
+            if not text:
+                raise ValueError(f"{path}:{number}: no 'text' field")
+            blocks.append((str(record.get("vendor") or record.get("id") or f"block{number}"), text))
+    return blocks
+
+
+def write_sources(folder: Path, combined: str) -> str:
+    """
+    Add a merged answer to the folder's original sources.txt; return "created", "appended"
+    or "unchanged". Existing content is kept: new answers go after a `---` separator.
+    """
+    path = folder / SOURCES_NAME
+    existing = path.read_text(encoding="utf-8") if path.exists() else ""
+    if not existing.strip():
+        path.write_text(combined, encoding="utf-8")
+        return "created"
+    if combined.strip() in existing:
+        return "unchanged"  # e.g. a re-run answered from the cache
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(("" if existing.endswith("\n") else "\n") + "\n---\n\n" + combined)
+    return "appended"
+
+
+def vendor_folder(data_dir: Path, name: str) -> Path:
+    """Vendor folder for a block name, minus characters Windows does not allow in paths."""
+    return data_dir / re.sub(r'[<>:"/\\|?*]', "", name).strip().rstrip(".")
+
+
+async def run_batch(
+    blocks: Sequence[Tuple[str, str]],
+    data_dir: Path,
+    results_path: Path,
+    concurrency: int = BATCH_CONCURRENCY,
+    graph=None,
+) -> Tuple[int, int]:
+    """
+    Run every block through the graph, at most `concurrency` at a time; return (succeeded, failed).
+    - Results are appended to `results_path` (JSONL) in completion order, one line per block.
+    - A block with at least one answer gets <data-dir>/<vendor>/original sources.txt
+      (created, or appended to; see write_sources).
+    """
+    graph = graph or get_graph()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _one(name: str, text: str) -> Dict[str, Any]:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                state = await graph.ainvoke({"input_text": text})
+            except Exception as exc:  # noqa: BLE001
+                return {"vendor": name, "error": f"{type(exc).__name__}: {exc}"}
+        record = {
+            "vendor": name,
+            "seconds": round(time.perf_counter() - start, 2),
+            **{key: state.get(key) for key in ("meta", "outputs", "errors", "timings", "cached")},
+        }
+        if state.get("combined"):
+            folder = vendor_folder(data_dir, name)
+            folder.mkdir(parents=True, exist_ok=True)
+            record["sources_action"] = write_sources(folder, state["combined"])
+            record["sources_file"] = str(folder / SOURCES_NAME)
+        else:
+            record["error"] = "no model answered"
+        return record
+
+    succeeded = failed = 0
+    tasks = [asyncio.ensure_future(_one(name, text)) for name, text in blocks]
+    with open(results_path, "w", encoding="utf-8") as out:
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()  # readable while the batch is still running
+            if "error" in record:
+                failed += 1
+                print(f"  FAILED {record['vendor']}: {record['error']}")
+            else:
+                succeeded += 1
+                print(
+                    f"  done {record['vendor']} ({record['seconds']}s) -> "
+                    f"{record['sources_file']} ({record['sources_action']})"
+                )
+    return succeeded, failed
 
 
 def _read_input(args: argparse.Namespace) -> str:
@@ -170,16 +463,88 @@ def _read_input(args: argparse.Namespace) -> str:
 
 
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Single OpenAI node via LangGraph.")
+    parser = argparse.ArgumentParser(description="Fan a prompt out to many models via LangGraph.")
     parser.add_argument("--input-file", help="Path to a text file containing the product block.")
     parser.add_argument("--input-text", help="Inline text block for the product.")
     parser.add_argument(
         "--run",
         action="store_true",
-        help="If set, call the model (paid). If omitted, only show parsed input and prompt.",
+        help="If set, call the models (paid). If omitted, only show parsed input and prompt.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print tokens as they arrive (the first model to answer live, the others when done).",
+    )
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        default=list(DEFAULT_MODELS),
+        help=f"OpenRouter model ids to query in parallel (default: {' '.join(DEFAULT_MODELS)}).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=MODEL_TIMEOUT,
+        help=f"Seconds each model may take before it is skipped (default: {MODEL_TIMEOUT:g}).",
+    )
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        help="Directory of *.txt blocks, or a JSONL file of {vendor, text} records, run at once.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=BATCH_CONCURRENCY,
+        help=f"Batch mode: blocks in flight at the same time (default: {BATCH_CONCURRENCY}).",
+    )
+    parser.add_argument(
+        "--results",
+        type=Path,
+        default=Path("fanout_results.jsonl"),
+        help="Batch mode: JSONL file for each finished state (default: fanout_results.jsonl).",
+    )
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=Path("."),
+        help=f"Batch mode: parent of the vendor folders receiving '{SOURCES_NAME}' (default: .).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the response cache.",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Ask the models again and overwrite their cached answers.",
+    )
+    parser.add_argument(
+        "--cache-path",
+        type=Path,
+        default=Path(CACHE_FILE_NAME),
+        help=f"SQLite response cache (default: {CACHE_FILE_NAME}).",
+    )
+    parser.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=DEFAULT_TTL_SECONDS / 86400,
+        help=f"Re-fetch cached answers older than this (default: {DEFAULT_TTL_SECONDS / 86400:g}).",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / 2**20,
+        help=f"Size budget in MB; oldest-used go first (default: {DEFAULT_MAX_BYTES >> 20}).",
     )
     args = parser.parse_args()
 
+    if args.batch:
+        _main_batch(args)
+        return
+
     raw = _read_input(args)
     meta = parse_input(raw)
     prompt = build_prompt(meta)
@@ -193,11 +558,92 @@ def main() -> None:
         print("\n(--run not set; skipping API call.)")
         return
 
-    print("\nCalling OpenAI node (this may incur cost)...\n")
-    state = asyncio.run(run_single(raw))
-    output = state.get("openai_output", "")
+    print(f"\nCalling {len(args.models)} model(s) in parallel (this may incur cost)...\n")
+    cache = _open_cache(args)
+    try:
+        graph = get_graph(tuple(args.models), args.timeout, cache)
+        if args.stream:
+            asyncio.run(_print_stream(raw, graph))
+            return
+        state = asyncio.run(run_single(raw, graph))
+    finally:
+        _close_cache(cache)
+    divider = "=" * 40
+    for model in dict.fromkeys(args.models):
+        output = state.get("outputs", {}).get(model, "")
+        seconds = state.get("timings", {}).get(model)
+        source = ", cached" if state.get("cached", {}).get(model) else ""
+        print(f"\n{divider}\n{model.upper()} ({seconds}s{source})\n{divider}\n{output}\n")
+
+
+async def _print_stream(raw: str, graph) -> None:
+    # Tokens of several models would interleave, so only the first model to stream
+    # is printed live; every other answer is printed whole when its node finishes.
     divider = "=" * 40
-    print(f"\n{divider}\nOPENAI\n{divider}\n{output}\n")
+    live = None
+    async for event in stream_single(raw, graph):
+        if event["type"] == "token":
+            if live is None:
+                live = event["model"]
+                print(f"\n{divider}\n{live.upper()} (streaming)\n{divider}")
+            if event["model"] == live:
+                print(event["text"], end="", flush=True)
+        elif event["type"] == "answer":
+            if event["model"] == live:
+                print(f"\n{event['text']}\n" if event["error"] else "\n")
+            else:
+                header = event["model"].upper() + (" (cached)" if event["cached"] else "")
+                print(f"\n{divider}\n{header}\n{divider}\n{event['text']}\n")
+
+
+def _open_cache(args: argparse.Namespace) -> LLMCache | None:
+    if args.no_cache:
+        return None
+    return LLMCache(
+        args.cache_path,
+        ttl=args.cache_ttl_days * 86400,
+        max_bytes=int(args.cache_max_mb * 2**20),
+        refresh=args.refresh,
+    )
+
+
+def _close_cache(cache: LLMCache | None) -> None:
+    if cache is not None:
+        print(f"Response cache: {cache.summary()} | {cache.path}")
+        cache.close()
+
+
+def _main_batch(args: argparse.Namespace) -> None:
+    if args.concurrency < 1:
+        raise SystemExit("--concurrency must be at least 1.")
+    blocks = load_blocks(args.batch)
+    if not blocks:
+        raise SystemExit(f"No product blocks found in {args.batch}.")
+    print(f"{len(blocks)} block(s) from {args.batch}:")
+    for name, text in blocks:
+        prompt_chars = len(build_prompt(parse_input(text)))
+        sources = vendor_folder(args.data_dir, name) / SOURCES_NAME
+        action = f"append to existing {SOURCES_NAME}" if sources.exists() else "new"
+        print(f"- {name} ({prompt_chars} prompt chars) -> {sources.parent} ({action})")
+    if not args.run:
+        print("\n(--run not set; skipping API calls.)")
+        return
+
+    print(
+        f"\nRunning {len(blocks)} block(s) x {len(args.models)} model(s), "
+        f"{args.concurrency} block(s) at a time (this may incur cost)...\n"
+    )
+    cache = _open_cache(args)
+    try:
+        graph = get_graph(tuple(args.models), args.timeout, cache)
+        succeeded, failed = asyncio.run(
+            run_batch(blocks, args.data_dir, args.results, args.concurrency, graph)
+        )
+    finally:
+        _close_cache(cache)
+    print(f"\n{succeeded} succeeded | {failed} failed | results: {args.results}")
+    if failed:
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,94 @@
+"""
+Import-time check for agents.fanout (or another module).
+
+Importing agents.fanout should stay cheap: dry runs and batch planning never call
+a model, so langchain_openai / langgraph / dotenv are only imported on first use.
+This runs `python -X importtime -c "import <module>"` in a fresh interpreter
+(without the OpenRouter key, to prove none is needed), reports the cumulative
+import time and the slowest imports, and fails if the budget is exceeded or a
+deferred dependency is imported eagerly again.
+
+CLI examples:
+  python -m agents.import_time
+  python -m agents.import_time --budget-ms 100 --top 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+# Packages that must not be imported just by importing the module.
+DEFERRED_PACKAGES = ("langgraph", "langchain_openai", "langchain_core", "openai", "dotenv")
+# Cumulative import time allowed for the module (best of --runs).
+DEFAULT_BUDGET_MS = 150.0
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def import_times(module: str) -> List[Tuple[int, int, str]]:
+    """(self us, cumulative us, module name) for every import done by `import module`."""
+    env = {k: v for k, v in os.environ.items() if k != "openrouter_api_key"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+    rows = []
+    for line in result.stderr.splitlines():
+        # "import time:       668 |      47834 | agents.fanout"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure how long importing a module takes.")
+    parser.add_argument("--module", default="agents.fanout", help="Module to import.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Fail above this many ms, best cumulative time (default: {DEFAULT_BUDGET_MS:g}).",
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters (default: 3).")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports shown (default: 10).")
+    args = parser.parse_args()
+
+    # Best of several runs; the first one may also be compiling .pyc files.
+    best: List[Tuple[int, int, str]] = []
+    best_us = None
+    for _ in range(max(args.runs, 1)):
+        rows = import_times(args.module)
+        total_us = next(cumulative for _, cumulative, name in rows if name == args.module)
+        if best_us is None or total_us < best_us:
+            best, best_us = rows, total_us
+
+    print(f"import {args.module}: {best_us / 1000:.1f} ms (best of {args.runs})")
+    print("Slowest imports (self time):")
+    for self_us, cumulative_us, name in sorted(best, reverse=True)[: args.top]:
+        print(f"  {self_us / 1000:7.1f} ms  (cumulative {cumulative_us / 1000:7.1f} ms)  {name}")
+
+    problems = []
+    top_level = {name.split(".")[0] for _, _, name in best}
+    eager = sorted(top_level & set(DEFERRED_PACKAGES))
+    if eager:
+        problems.append(f"imported eagerly: {', '.join(eager)}")
+    if best_us / 1000 > args.budget_ms:
+        problems.append(f"over budget: {best_us / 1000:.1f} ms > {args.budget_ms:g} ms")
+    if problems:
+        raise SystemExit("FAILED: " + "; ".join(problems))
+    print(f"OK (budget {args.budget_ms:g} ms, no deferred packages imported)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Disk-backed cache of model answers for agents.fanout (SQLite).
+
+Overall goal (plain English)
+- Re-running the fan-out for a vendor whose block did not change sends the same
+  paid request again. With the cache, an identical request (same model id, system
+  prompt, prompt text and sampling parameters) is answered from disk instantly.
+- Entries expire after a TTL; when the file grows past its size budget, the least
+  recently used answers are dropped first.
+- Only real answers are stored: errors and timeouts are always retried.
+
+Where it fits
+- fanout.py opens one LLMCache per run (default `.fanout_cache.sqlite` in the
+  current directory) and passes it to the model nodes; --no-cache turns it off,
+  --refresh skips reads but still stores the new answers.
+- hits / misses / stores / expired / evicted counters are printed after a run.
+"""
+
+from __future__ import annotations
+
+import hashlib  # cache keys
+import json  # canonical key material
+import sqlite3  # stdlib SQLite driver
+import time  # entry ages
+from pathlib import Path  # handle file system paths
+from typing import Any, Dict, Optional
+
+# Default cache file, created in the current directory.
+CACHE_FILE_NAME = ".fanout_cache.sqlite"
+# Answers older than this are fetched again.
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+# Total answer bytes kept before least-recently-used entries are evicted.
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+# Seconds a writer waits for another process's transaction before failing.
+BUSY_TIMEOUT = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    content TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+
+def cache_key(model_id: str, system_prompt: str, prompt: str, params: Dict[str, Any]) -> str:
+    """SHA-256 over everything that changes the answer."""
+    material = json.dumps(
+        [model_id, system_prompt, prompt, params], sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Thin wrapper over the SQLite file; use as a context manager."""
+
+    def __init__(
+        self,
+        path: Path = Path(CACHE_FILE_NAME),
+        ttl: float = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        refresh: bool = False,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.refresh = refresh  # skip reads, still write
+        # Model nodes run as tasks on one event loop; the loop may not be the creating thread.
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # parallel batch runs can share the file
+        self.conn.executescript(SCHEMA)
+        self.counters = {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0}
+
+    def __enter__(self) -> LLMCache:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached answer for a key, or None (missing, expired, or --refresh)."""
+        if self.refresh:
+            self.counters["misses"] += 1
+            return None
+        row = self.conn.execute(
+            "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        now = time.time()
+        if row is not None and now - row[1] > self.ttl:
+            with self.conn:
+                self.conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self.counters["expired"] += 1
+            row = None
+        if row is None:
+            self.counters["misses"] += 1
+            return None
+        with self.conn:
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        self.counters["hits"] += 1
+        return row[0]
+
+    def put(self, key: str, model_id: str, content: str) -> None:
+        """Store an answer, then evict least recently used entries beyond the size budget."""
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, model, content, size, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model_id, content, len(content.encode("utf-8")), now, now),
+            )
+        self.counters["stores"] += 1
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop oldest-used entries until the stored answers fit in max_bytes."""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        rows = self.conn.execute("SELECT key, size FROM responses ORDER BY last_used")
+        for key, size in rows.fetchall():
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        with self.conn:
+            self.conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+        self.counters["evicted"] += len(doomed)
+
+    def summary(self) -> str:
+        """One-line counter report."""
+        return " | ".join(f"{name}: {count}" for name, count in self.counters.items())
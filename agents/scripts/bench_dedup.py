@@ -0,0 +1,381 @@
+"""
+Overview
+--------
+Benchmark for the dedup scripts on synthetic `original sources.txt` corpora.
+
+The two checked-in vendor folders are a few hundred links each, too small to show
+scaling problems. This script:
+  - generates corpora of a given size (default 1, 10 and 100 MB) shaped like the real
+    LLM outputs: vendor header lines, numbered sources with markdown links
+    (`[url](url)`, `[title](url)`), raw and `**emphasized**` URLs, tracking
+    parameters, and a share of links that repeat an earlier URL in another form;
+  - times `build_dictionary1`, `normalize_url` (cold cache, every link),
+    `mark_duplicates` and `save_output` for deduplicate_sources.py and
+    deduplicate_sources_with_summaries.py, then measures each stage's peak Python
+    memory (tracemalloc) in one extra run;
+  - hashes the written dictionary1.json / deduplicated.json, so two reports on the
+    same corpus show whether an optimization changed the output.
+
+Corpora depend only on --seed and the size, so reports from different commits are
+comparable. The report (JSON) records the corpus hashes, the git commit and the
+numbers; with --baseline, output hashes are checked against an earlier report and
+the script exits non-zero on any difference.
+
+Usage
+-----
+    python bench_dedup.py [--sizes 1 10 100] [--repeat 3] [--report dedup_bench.json]
+    # before/after: benchmark an older checkout's scripts with this file
+    git worktree add ../before <commit>
+    python bench_dedup.py --scripts-dir ../before/agents/scripts --report before.json
+    python bench_dedup.py --baseline before.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Dedup script modules that can be benchmarked, by short name.
+VARIANTS = {
+    "plain": "deduplicate_sources",
+    "summaries": "deduplicate_sources_with_summaries",
+}
+STAGES = ("build_dictionary1", "normalize_url", "mark_duplicates", "save_output")
+OUTPUT_NAMES = ("dictionary1.json", "deduplicated.json")
+DEFAULT_SIZES_MB = (1, 10, 100)
+# Share of source links that repeat a URL already cited in the corpus.
+DEFAULT_DUPLICATE_RATIO = 0.45
+
+# Building blocks for synthetic sources (hosts seen in the real vendor folders and similar).
+HOSTS = (
+    "agfahealthcare.com", "sironamedical.com", "fda.gov", "accessdata.fda.gov", "rsna.org",
+    "pubs.rsna.org", "ncbi.nlm.nih.gov", "pmc.ncbi.nlm.nih.gov", "hhs.gov", "ihe.net",
+    "dicomstandard.org", "hl7.org", "auntminnie.com", "itnonline.com", "healthimaging.com",
+    "radiologybusiness.com", "prnewswire.com", "businesswire.com", "linkedin.com", "youtube.com",
+)
+WORDS = (
+    "enterprise imaging platform viewer universal zero footprint streaming client archive vna "
+    "workflow radiology cardiology pathology breast molecular diagnostic quality release notes "
+    "customer brochure clearance 510k summary integration epic cerner ehr cloud ai worklist "
+    "reporting dictation security interoperability dicom hl7 fhir deployment migration "
+    "performance study evaluation press announcement partnership webinar case outcomes"
+).split()
+KINDS = ("web page", "PDF brochure", "press release", "journal article", "FDA database entry", "video")
+TRACKING = ("utm_source=chatgpt.com", "utm_source=openai", "utm_medium=referral&utm_campaign=pacs")
+# (link style, weight): markdown with the URL as text dominates the real files.
+LINK_STYLES = (("md_self", 45), ("md_title", 20), ("raw", 20), ("emphasis", 10), ("paren", 5))
+
+
+def make_url(rng: random.Random) -> str:
+    """A new canonical URL: host plus 1-4 word path segments, sometimes a PDF or an id query."""
+    host = rng.choice(HOSTS)
+    segments = ["-".join(rng.choices(WORDS, k=rng.randint(1, 4))) for _ in range(rng.randint(1, 4))]
+    path = "/".join(segments)
+    roll = rng.random()
+    if roll < 0.2:
+        path += ".pdf"
+    elif roll < 0.3:
+        path += f"?id={rng.randint(1, 99999)}"
+    else:
+        path += "/"
+    return f"{host}/{path}"
+
+
+def surface_form(url: str, rng: random.Random) -> str:
+    """One of the ways an LLM writes the same URL (scheme, www, port, slash, tracking query)."""
+    host, _, rest = url.partition("/")
+    if rng.random() < 0.5:
+        host = f"www.{host}"
+    if rng.random() < 0.05:
+        host += ":443"
+    if rest.endswith("/") and rng.random() < 0.3:
+        rest = rest[:-1]
+    written = f"{host}/{rest}"
+    roll = rng.random()
+    if roll < 0.6:
+        written = f"https://{written}"
+    elif roll < 0.7:
+        written = f"http://{written}"
+    if rng.random() < 0.15:
+        written += ("&" if "?" in written else "?") + rng.choice(TRACKING)
+    return written
+
+
+def write_link(url: str, rng: random.Random) -> str:
+    """Render a link in one of the markdown / raw styles."""
+    style = rng.choices([s for s, _ in LINK_STYLES], weights=[w for _, w in LINK_STYLES])[0]
+    if style == "md_self":
+        return f"[{url}]({url})"
+    if style == "md_title":
+        return f"[{' '.join(rng.choices(WORDS, k=rng.randint(2, 6))).title()}]({url})"
+    if style == "emphasis":
+        return f"**{url}**"
+    if style == "paren":
+        return f"({url})."
+    return url
+
+
+def generate_corpus(size_bytes: int, seed: int = 0, duplicate_ratio: float = DEFAULT_DUPLICATE_RATIO) -> str:
+    """
+    Deterministic synthetic `original sources.txt` of about `size_bytes` UTF-8 bytes.
+    - Blocks follow the real files: a vendor header line with the product link, then a
+      numbered source (link, title line, 2-4 description lines, some with inline links).
+    - Each source link repeats an earlier URL with probability `duplicate_ratio`.
+    """
+    rng = random.Random(f"{seed}:{size_bytes}")
+    cited: list[str] = []
+    blocks: list[str] = []
+    total = 0
+    product = header_url = ""
+    while total < size_bytes:
+        if not cited or rng.random() < 0.02:  # next vendor section
+            product = " ".join(rng.choices(WORDS, k=3)).title()
+            header_url = make_url(rng)
+            cited.append(header_url)
+        if rng.random() < duplicate_ratio:
+            url = rng.choice(cited)
+        else:
+            url = make_url(rng)
+            cited.append(url)
+        lines = [
+            f"[{product}] | PACS / Diagnostic Imaging Viewer | {write_link(surface_form(header_url, rng), rng)}",
+            "",
+            f"1. {write_link(surface_form(url, rng), rng)}",
+            f"2. {' '.join(rng.choices(WORDS, k=rng.randint(3, 8))).title()} — {rng.choice(HOSTS)} — "
+            f"{rng.choice(KINDS)} (date not shown)",
+        ]
+        for _ in range(rng.randint(2, 4)):
+            sentence = " ".join(rng.choices(WORDS, k=rng.randint(12, 30)))
+            if rng.random() < 0.2:
+                sentence += f" see {write_link(surface_form(rng.choice(cited), rng), rng)}"
+            lines.append(f"   {sentence.capitalize()}.")
+        block = "\n".join(lines) + "\n\n"
+        blocks.append(block)
+        total += len(block.encode("utf-8"))
+    return "".join(blocks)
+
+
+def sha256_text_file(path: Path) -> str:
+    """Hex SHA-256 of a file's bytes."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def clear_cache(func) -> None:
+    """Empty an lru_cache'd function's cache (no-op for uncached versions)."""
+    cache_clear = getattr(func, "cache_clear", None)
+    if cache_clear:
+        cache_clear()
+
+
+class StageClock:
+    """Runs pipeline stages, recording seconds (and peak traced bytes when tracemalloc is on)."""
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = {}
+        self.peak_bytes: dict[str, int] = {}
+
+    def run(self, name: str, func, *args):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = func(*args)
+        self.seconds[name] = time.perf_counter() - start
+        if tracing:
+            self.peak_bytes[name] = tracemalloc.get_traced_memory()[1] - baseline
+        return result
+
+
+def run_pipeline(module, text: str, source: Path, clock: StageClock) -> tuple[int, int]:
+    """One full dedup of `text` with the module's functions; outputs go next to `source`."""
+    normalize = module.normalize_url
+    clear_cache(normalize)  # build_dictionary1 normalizes every link; start cold each run
+    dictionary1 = clock.run("build_dictionary1", module.build_dictionary1, text)
+    originals = [entry["original form"] for entry in dictionary1.values()]
+    clear_cache(normalize)
+    clock.run("normalize_url", lambda: [normalize(url) for url in originals])
+    dictionary1 = clock.run("mark_duplicates", module.mark_duplicates, dictionary1)
+    dictionary2 = module.build_dictionary2(dictionary1)
+    clock.run("save_output", module.save_output, source, dictionary1, dictionary2)
+    return len(dictionary1), len(dictionary2)
+
+
+def bench_variant(module, text: str, source: Path, repeat: int, memory: bool) -> dict:
+    """Timing runs, an optional tracemalloc run, and the output hashes for one variant and corpus."""
+    runs: list[dict[str, float]] = []
+    for _ in range(repeat):
+        clock = StageClock()
+        links, deduplicated = run_pipeline(module, text, source, clock)
+        runs.append(clock.seconds)
+    stages = {
+        name: {
+            "seconds_min": round(min(run[name] for run in runs), 4),
+            "seconds_median": round(statistics.median(run[name] for run in runs), 4),
+        }
+        for name in STAGES
+    }
+    if memory:
+        clock = StageClock()
+        tracemalloc.start()
+        try:
+            run_pipeline(module, text, source, clock)
+        finally:
+            tracemalloc.stop()
+        for name in STAGES:
+            stages[name]["peak_mib"] = round(clock.peak_bytes[name] / 2**20, 2)
+    return {
+        "links": links,
+        "deduplicated": deduplicated,
+        "links_per_second": round(links / stages["build_dictionary1"]["seconds_min"]),
+        "stages": stages,
+        "outputs": {name: sha256_text_file(source.with_name(name)) for name in OUTPUT_NAMES},
+    }
+
+
+def git_commit(path: Path) -> str | None:
+    """HEAD commit of the checkout containing `path` (None outside git)."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=path, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare_outputs(report: dict, baseline: dict) -> list[str]:
+    """Differences in output hashes for (variant, corpus) pairs present in both reports."""
+    previous = {(r["variant"], r["corpus_sha256"]): r["outputs"] for r in baseline.get("results", [])}
+    mismatches = []
+    for result in report["results"]:
+        expected = previous.get((result["variant"], result["corpus_sha256"]))
+        if expected is None:
+            continue
+        for name, digest in result["outputs"].items():
+            if expected.get(name) != digest:
+                mismatches.append(f"{result['variant']} {result['size_mb']} MB: {name} differs")
+    return mismatches
+
+
+def main() -> None:
+    """Entry point: generate corpora, benchmark each variant, write the JSON report."""
+    parser = argparse.ArgumentParser(description="Benchmark the dedup scripts on synthetic corpora.")
+    parser.add_argument(
+        "--sizes",
+        type=float,
+        nargs="+",
+        default=list(DEFAULT_SIZES_MB),
+        help="Corpus sizes in MB (default: 1 10 100).",
+    )
+    parser.add_argument(
+        "--variants",
+        nargs="+",
+        choices=sorted(VARIANTS),
+        default=sorted(VARIANTS),
+        help="Scripts to benchmark: plain = deduplicate_sources.py, summaries = ..._with_summaries.py.",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per variant and size (default: 3).")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed (default: 0).")
+    parser.add_argument(
+        "--duplicate-ratio",
+        type=float,
+        default=DEFAULT_DUPLICATE_RATIO,
+        help=f"Share of source links repeating an earlier URL (default: {DEFAULT_DUPLICATE_RATIO}).",
+    )
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory run.")
+    parser.add_argument(
+        "--scripts-dir",
+        type=Path,
+        default=Path(__file__).resolve().parent,
+        help="Directory to import the dedup scripts from, e.g. an older checkout (default: this folder).",
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        default=None,
+        help="Keep corpora and outputs here, re-using existing corpora (default: a temporary folder).",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=Path("dedup_bench.json"),
+        help="JSON report to write (default: dedup_bench.json).",
+    )
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Earlier report; exit non-zero if any output hash on the same corpus differs.",
+    )
+    args = parser.parse_args()
+    if args.repeat < 1:
+        raise SystemExit("--repeat must be at least 1.")
+
+    scripts_dir = args.scripts_dir.resolve()
+    sys.path.insert(0, str(scripts_dir))  # before importing, so --scripts-dir wins
+    modules = {name: importlib.import_module(VARIANTS[name]) for name in args.variants}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = args.work_dir or Path(tmp)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        report: dict = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_commit": git_commit(scripts_dir),
+            "scripts_dir": str(scripts_dir),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "params": {
+                "seed": args.seed,
+                "duplicate_ratio": args.duplicate_ratio,
+                "repeat": args.repeat,
+                "memory": not args.no_memory,
+            },
+            "results": [],
+        }
+        for size_mb in args.sizes:
+            corpus = work_dir / f"corpus-{size_mb:g}MB-seed{args.seed}.txt"
+            if not corpus.exists():
+                print(f"Generating {corpus.name} ...")
+                text = generate_corpus(int(size_mb * 2**20), args.seed, args.duplicate_ratio)
+                corpus.write_text(text, encoding="utf-8")
+            # Read back like the scripts do, so the benchmark sees exactly the file's text.
+            text = corpus.read_text(encoding="utf-8", errors="replace")
+            corpus_sha256 = sha256_text_file(corpus)
+            for name, module in modules.items():
+                source = work_dir / f"{name}-{size_mb:g}MB" / "original sources.txt"
+                source.parent.mkdir(exist_ok=True)
+                print(f"Benchmarking {name} on {size_mb:g} MB ...")
+                result = bench_variant(module, text, source, args.repeat, not args.no_memory)
+                report["results"].append(
+                    {"variant": name, "size_mb": size_mb, "corpus_sha256": corpus_sha256, **result}
+                )
+                timings = " | ".join(f"{stage}: {result['stages'][stage]['seconds_min']}s" for stage in STAGES)
+                print(f"  links: {result['links']} | deduplicated: {result['deduplicated']} | {timings}")
+
+    if args.baseline:
+        mismatches = compare_outputs(report, json.loads(args.baseline.read_text(encoding="utf-8")))
+        report["baseline"] = {"path": str(args.baseline), "mismatches": mismatches}
+    args.report.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Report: {args.report}")
+    if args.baseline:
+        if report["baseline"]["mismatches"]:
+            for line in report["baseline"]["mismatches"]:
+                print(f"  OUTPUT CHANGED: {line}")
+            raise SystemExit("Outputs differ from the baseline.")
+        print(f"Outputs match {args.baseline}.")
+
+
+if __name__ == "__main__":
+    main()
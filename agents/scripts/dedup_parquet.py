@@ -0,0 +1,125 @@
+"""
+Columnar (Parquet) copy of the dedup output, and a loader for it.
+
+Overall goal (plain English)
+- dictionary1.json / deduplicated.json are indented JSON, bigger than the source
+  text, and every reader has to parse all of it.
+- `dedup_links.parquet` (next to them, written with --parquet) holds one row per
+  link with typed columns: positions as integers, `selected` as a boolean, and a
+  `group_id` shared by every link with the same bare-minimum form. The
+  deduplicated set is simply `selected == true`.
+- `load_links()` reads only the columns a caller asks for, from one vendor file
+  or from a whole data directory at once (one scan for cross-vendor analytics).
+
+Where it fits
+- deduplicate_sources*.py write it; fetch_links.py reads just the `original`
+  column of selected rows when the file is newer than deduplicated.json.
+- pyarrow is optional: without it the JSON outputs work as before.
+"""
+
+from __future__ import annotations
+
+import os  # atomic replace
+from pathlib import Path  # handle file system paths
+
+try:
+    import pyarrow as pa  # columnar arrays and schema
+    import pyarrow.dataset as ds  # multi-file scans with projection/filter
+    import pyarrow.parquet as pq  # Parquet writer
+
+    PYARROW_AVAILABLE = True  # flag if pyarrow is installed
+except ImportError:
+    PYARROW_AVAILABLE = False  # JSON output only
+
+# File name next to dictionary1.json / deduplicated.json.
+PARQUET_NAME = "dedup_links.parquet"
+# Rows buffered before a row group is written (bounds memory on streamed folders).
+ROW_GROUP_SIZE = 65536
+
+
+def link_schema() -> pa.Schema:
+    """Column names and types of dedup_links.parquet."""
+    return pa.schema(
+        [
+            ("vendor", pa.string()),  # vendor folder name
+            ("link", pa.string()),  # dictionary key, e.g. "link12"
+            ("link_number", pa.int32()),  # 12
+            ("original", pa.string()),  # original form
+            ("bare", pa.string()),  # bare-minimum form
+            ("start", pa.int64()),  # first character (0-based)
+            ("end", pa.int64()),  # last character (inclusive)
+            ("selected", pa.bool_()),  # kept in deduplicated.json
+            ("group_id", pa.int32()),  # same value for every link with the same bare form
+            ("duplicates", pa.list_(pa.string())),  # other links in the group
+            ("summary", pa.string()),  # accompanying RAG summary + metadata string
+        ]
+    )
+
+
+class ParquetLinkWriter:
+    """Writes dictionary1 entries as rows, one row group at a time; call close() to publish the file."""
+
+    def __init__(self, path: Path, vendor: str) -> None:
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet output needs the 'pyarrow' package")
+        self.path = path
+        self.vendor = vendor
+        self._tmp = path.with_suffix(".parquet.tmp")
+        self._schema = link_schema()
+        self._writer = pq.ParquetWriter(self._tmp, self._schema, compression="zstd")
+        self._rows: dict[str, list] = {name: [] for name in self._schema.names}
+
+    def add(self, key: str, entry: dict, group_id: int) -> None:
+        """Buffer one dictionary1 entry."""
+        row = self._rows
+        row["vendor"].append(self.vendor)
+        row["link"].append(key)
+        row["link_number"].append(int(key.removeprefix("link")))
+        row["original"].append(entry["original form"])
+        row["bare"].append(entry["bare minimum form"])
+        row["start"].append(entry["original start position of the current link"])
+        row["end"].append(entry["original end position of the current link"])
+        row["selected"].append(entry["selected"] == 1)
+        row["group_id"].append(group_id)
+        row["duplicates"].append(entry["duplicate list"])
+        row["summary"].append(entry["accompanying RAG summary + metadata string"])
+        if len(row["link"]) >= ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write buffered rows as one row group."""
+        if self._rows["link"]:
+            self._writer.write_table(pa.table(self._rows, schema=self._schema))
+            self._rows = {name: [] for name in self._schema.names}
+
+    def close(self) -> None:
+        """Write what is left and move the file into place."""
+        self._flush()
+        self._writer.close()
+        os.replace(self._tmp, self.path)
+
+
+def write_parquet(path: Path, vendor: str, dictionary1: dict[str, dict]) -> None:
+    """Write a whole dictionary1 (group ids follow first occurrence of each bare form)."""
+    group_ids: dict[str, int] = {}
+    writer = ParquetLinkWriter(path, vendor)
+    for key, entry in dictionary1.items():
+        group_id = group_ids.setdefault(entry["bare minimum form"], len(group_ids))
+        writer.add(key, entry, group_id)
+    writer.close()
+
+
+def load_links(source: Path, columns: list[str] | None = None, selected_only: bool = False) -> pa.Table:
+    """
+    Read dedup_links.parquet rows as a pyarrow Table.
+    - `source`: one Parquet file, or a data directory (every */dedup_links.parquet).
+    - `columns`: only these columns are read from disk (None = all).
+    - `selected_only`: just the deduplicated set.
+    Use `.to_pandas()` / `.to_pylist()` on the result as needed.
+    """
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("Reading Parquet output needs the 'pyarrow' package")
+    files = [source] if source.is_file() else sorted(source.glob(f"*/{PARQUET_NAME}"))
+    dataset = ds.dataset([str(f) for f in files], schema=link_schema(), format="parquet")
+    row_filter = ds.field("selected") if selected_only else None
+    return dataset.to_table(columns=columns, filter=row_filter)
@@ -0,0 +1,48 @@
+"""
+Runs a dedup script's per-folder function over many source files (--jobs).
+
+Overall goal (plain English)
+- Each vendor folder is deduplicated independently, so folders can be spread
+  over a process pool; results still come back in input order, and one folder
+  that raises does not stop the others.
+
+Where it fits
+- deduplicate_sources.py and deduplicate_sources_with_summaries.py pass their
+  own `dedup_folder` to `run_folders`; `--url-rules` is re-applied in every worker.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor  # one worker process per folder at a time
+from pathlib import Path  # handle file system paths
+from typing import Any, Callable, Iterator
+
+from url_normalize import configure
+
+
+def run_folders(
+    dedup_folder: Callable[..., Any], source_files: list[Path], jobs: int, url_rules: Path | None, **options
+) -> Iterator[tuple[Path, Any]]:
+    """
+    Yield (source, dedup_folder result or error) for every source file, in the given order.
+    - `dedup_folder` must be a module-level function (workers import it); `options` are passed on to it.
+    - jobs == 1 runs in this process; otherwise folders are spread over a process pool
+      (jobs == 0 means one worker per CPU) and results are still yielded in input order.
+    - A folder that raises is reported as its exception; the others keep going.
+    """
+    if jobs == 1:
+        for src in source_files:
+            try:
+                yield src, dedup_folder(src, **options)
+            except Exception as e:
+                yield src, e
+        return
+    # Workers may be spawned (Windows), so they load the same URL rules themselves.
+    init_kwargs = {"initializer": configure, "initargs": (url_rules,)} if url_rules else {}
+    with ProcessPoolExecutor(max_workers=jobs or None, **init_kwargs) as pool:
+        futures = [pool.submit(dedup_folder, src, **options) for src in source_files]
+        for src, future in zip(source_files, futures):
+            try:
+                yield src, future.result()
+            except Exception as e:
+                yield src, e
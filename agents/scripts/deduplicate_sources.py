@@ -17,11 +17,16 @@ Goals and fit
 
 Usage
 -----
-    python deduplicate_sources.py [--data-dir .]
+    python deduplicate_sources.py [--data-dir .] [--jobs N]
 
 Key behaviors
 -------------
 - Character positions are 0-based; end positions are inclusive.
+- A dedup_state.json per folder records the source hash, the URL-rules fingerprint
+  and the output hashes: unchanged folders are skipped, and a source that only grew
+  at the end has just its new tail parsed and merged (--full re-parses everything).
+- Very large sources (or all, with --stream) are parsed from memory-mapped windows and
+  written entry by entry, so memory follows the number of links, not the file size.
 - Duplicate grouping is driven by a normalized "bare minimum" URL
   (scheme/`www` stripped, default ports dropped, tracking params removed, aliases
   applied).
@@ -30,12 +35,32 @@ Key behaviors
 from __future__ import annotations
 
 import argparse
+import codecs
+import hashlib
+import io
 import json
-import random
+import mmap
 import re
+import tempfile
 from collections import defaultdict
 from pathlib import Path
-from urllib.parse import urlparse
+from typing import Iterator
+
+from dedup_parquet import PARQUET_NAME, PYARROW_AVAILABLE, ParquetLinkWriter, write_parquet
+from dedup_runner import run_folders
+from global_index import INDEX_FILE_NAME, GlobalUrlIndex, index_rows
+from url_normalize import configure, fingerprint, normalize_url
+
+# Per-folder record of the last run: source hash/size, rules fingerprint, output hashes.
+STATE_NAME = "dedup_state.json"
+# Bump when extraction or selection changes, so folders are rebuilt once.
+STATE_VERSION = 1
+# Read size when hashing source files.
+HASH_CHUNK_SIZE = 1024 * 1024
+# Sources at least this big are parsed in streaming mode (--stream forces it for all).
+STREAM_THRESHOLD = 64 * 1024 * 1024
+# Bytes decoded per window in streaming mode.
+STREAM_WINDOW = 4 * 1024 * 1024
 
 LINK_PATTERN = re.compile(r"\[(?P<link_text>[^\]]+)\]\((?P<link_target>[^)]+)\)")
 # Raw URL pattern captures:
@@ -54,76 +79,13 @@ RAW_URL_PATTERN = re.compile(
 )
 
 
-def normalize_url(url: str) -> str:
-    """Return a bare-minimum form of the URL for duplicate detection."""
-    # Clean markdown emphasis and trailing punctuation.
-    candidate = url.strip()
-    # Strip surrounding markdown emphasis characters (e.g., **url** or *url*)
-    candidate = re.sub(r"^[*_]+", "", candidate)
-    candidate = re.sub(r"[*_]+$", "", candidate)
-    # Strip trailing punctuation that often trails links
-    candidate = candidate.rstrip(").,;")
-    # Ensure a scheme exists for urlparse.
-    if not re.match(r"^[a-zA-Z][a-zA-Z0-9+.-]*://", candidate):
-        candidate = f"http://{candidate}"
-
-    # Parse and normalize host/path/query.
-    try:
-        parsed = urlparse(candidate)
-    except ValueError:
-        # Handle malformed URLs (e.g., stray brackets) by stripping brackets and retrying.
-        candidate_fallback = candidate.strip("[]")
-        try:
-            parsed = urlparse(candidate_fallback)
-        except ValueError:
-            # If still invalid, return the cleaned candidate as-is to avoid crashes.
-            return candidate_fallback
-    netloc = parsed.netloc.lower()
-
-    if netloc.startswith("www."):
-        netloc = netloc[4:]
-
-    # Host aliases (add more as needed)
-    host_aliases = {
-        "agfa.com": "agfahealthcare.com",
-        "www.agfa.com": "agfahealthcare.com",
-    }
-    netloc = host_aliases.get(netloc, netloc)
-
-    if netloc.endswith(":80"):
-        netloc = netloc[: -len(":80")]
-    if netloc.endswith(":443"):
-        netloc = netloc[: -len(":443")]
-
-    # Normalize path (collapse duplicate slashes, drop trailing slash).
-    path = re.sub(r"/{2,}", "/", parsed.path or "").rstrip("/")
-
-    # Strip tracking params and fragments
-    tracking_prefixes = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "vero_id")
-    query_pairs = []
-    if parsed.query:
-        for key, value in [q.split("=", 1) if "=" in q else (q, "") for q in parsed.query.split("&") if q]:
-            if key.startswith(tracking_prefixes):
-                continue
-            query_pairs.append((key, value))
-    query = "&".join(f"{k}={v}" if v else k for k, v in query_pairs)
-
-    normalized = netloc + path
-    if query:
-        normalized = f"{normalized}?{query}"
-
-    return normalized
-
-
 def extract_summary(text: str, start: int, end: int) -> str:
     """Placeholder: summaries are intentionally not extracted in this variant."""
     return ""
 
 
-def build_dictionary1(text: str) -> dict[str, dict]:
-    """Parse one `original sources.txt` into dictionary1 entries with metadata."""
-    dictionary1: dict[str, dict] = {}
-
+def extract_entries(text: str) -> list[dict]:
+    """Find every link in `text`, in document order, as {"original form", "start", "end", "bare"}."""
     # First, capture markdown links ([text](url)); use the target as the original form.
     md_matches = list(LINK_PATTERN.finditer(text))
     entries: list[dict] = []
@@ -134,8 +96,9 @@ def build_dictionary1(text: str) -> dict[str, dict]:
         original_form = match.group("link_target").strip()
         start_pos = match.start("link_target")
         end_pos = match.end("link_target") - 1  # inclusive
-        occupied_ranges.append((start_pos, end_pos))
+        # Text span first: it precedes the target, which keeps occupied_ranges in document order.
         occupied_ranges.append((match.start("link_text"), match.end("link_text") - 1))
+        occupied_ranges.append((start_pos, end_pos))
         entries.append(
             {
                 "original form": original_form,
@@ -144,15 +107,20 @@ def build_dictionary1(text: str) -> dict[str, dict]:
             }
         )
 
-    # Next, capture raw URLs not already covered by markdown link targets.
-    def overlaps(span: tuple[int, int]) -> bool:
-        return any(not (span[1] < s or span[0] > e) for s, e in occupied_ranges)
-
+    # Next, capture raw URLs not already covered by markdown link spans.
+    # Markdown spans come out of finditer in document order and never overlap, and raw
+    # matches also arrive left to right, so one forward-moving cursor over the spans is
+    # enough (linear in the number of matches instead of matches x spans). Raw matches
+    # never overlap each other either, so accepted raw spans need no bookkeeping.
+    span_idx = 0
     for match in RAW_URL_PATTERN.finditer(text):
         start_pos = match.start("url")
         end_pos = match.end("url") - 1
-        if overlaps((start_pos, end_pos)):
-            continue
+        # Skip markdown spans that end before this match starts; later matches start even later.
+        while span_idx < len(occupied_ranges) and occupied_ranges[span_idx][1] < start_pos:
+            span_idx += 1
+        if span_idx < len(occupied_ranges) and occupied_ranges[span_idx][0] <= end_pos:
+            continue  # overlaps a markdown link
         # Record raw URL and mark its span.
         original_form = match.group("url").strip()
         entries.append(
@@ -162,7 +130,6 @@ def build_dictionary1(text: str) -> dict[str, dict]:
                 "end": end_pos,
             }
         )
-        occupied_ranges.append((start_pos, end_pos))
 
     # Sort by position to keep deterministic link numbering.
     entries.sort(key=lambda x: x["start"])
@@ -171,21 +138,37 @@ def build_dictionary1(text: str) -> dict[str, dict]:
     for entry in entries:
         entry["bare"] = normalize_url(entry["original form"])
 
-    for idx, entry in enumerate(entries):
-        link_key = f"link{idx + 1}"
-        dictionary1[link_key] = {
-            "duplicate list": [],
-            "original form": entry["original form"],
-            "bare minimum form": entry["bare"],
-            "original start position of the current link": entry["start"],
-            "original end position of the current link": entry["end"],
-            "accompanying RAG summary + metadata string": "",
-            "selected": 0,
-        }
+    return entries
+
+
+def build_dictionary1(text: str, offset: int = 0, first_link: int = 1) -> dict[str, dict]:
+    """
+    Parse one `original sources.txt` into dictionary1 entries with metadata.
+    - `offset`/`first_link` let an appended tail be parsed on its own: positions are
+      shifted by `offset` and numbering continues from `first_link`.
+    """
+    dictionary1: dict[str, dict] = {}
+    for idx, entry in enumerate(extract_entries(text)):
+        dictionary1[f"link{idx + first_link}"] = link_payload(
+            entry["original form"], entry["bare"], entry["start"] + offset, entry["end"] + offset
+        )
 
     return dictionary1
 
 
+def link_payload(original: str, bare: str, start: int, end: int) -> dict:
+    """One dictionary1 value, before duplicates are marked."""
+    return {
+        "duplicate list": [],
+        "original form": original,
+        "bare minimum form": bare,
+        "original start position of the current link": start,
+        "original end position of the current link": end,
+        "accompanying RAG summary + metadata string": "",
+        "selected": 0,
+    }
+
+
 def mark_duplicates(dictionary1: dict[str, dict]) -> dict[str, dict]:
     """Fill duplicate lists and select the first-occurring representative per bare URL."""
     groups: dict[str, list[str]] = defaultdict(list)
@@ -224,14 +207,299 @@ def process_file(path: Path) -> tuple[dict[str, dict], dict[str, dict]]:
     return dictionary1, dictionary2
 
 
-def save_output(path: Path, dictionary1: dict[str, dict], dictionary2: dict[str, dict]) -> None:
+def save_output(path: Path, dictionary1: dict[str, dict], dictionary2: dict[str, dict]) -> dict[str, str]:
+    """
+    Write dictionary1.json and deduplicated.json next to the source file; return {file name: sha256}.
+    """
+    hashes = {}
+    for name, payload in (("dictionary1.json", dictionary1), ("deduplicated.json", dictionary2)):
+        output = path.with_name(name)
+        output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        hashes[name] = sha256_file(output)  # hash what is on disk (newlines differ on Windows)
+    return hashes
+
+
+def sha256_file(path: Path, limit: int | None = None) -> str:
+    """SHA-256 of a file, or of its first `limit` bytes."""
+    digest = hashlib.sha256()
+    remaining = limit
+    with open(path, "rb") as f:
+        while remaining is None or remaining > 0:
+            chunk = f.read(HASH_CHUNK_SIZE if remaining is None else min(HASH_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def appendable(text: str) -> bool:
+    """
+    True if anything appended after `text` cannot change the links already found in it.
+    - It must end in whitespace, so no raw URL can run on into the appended text.
+    - Every "[" must have a "]" after it, and the last "](" must already be closed by ")":
+      otherwise the appended text could complete a markdown link that swallows links
+      found earlier.
+    """
+    if not text or not text[-1].isspace():
+        return False
+    if text.rfind("[") > text.rfind("]"):
+        return False
+    last_target = text.rfind("](")
+    return last_target == -1 or text.find(")", last_target + 2) != -1
+
+
+def load_state(src: Path) -> dict | None:
+    """The folder's dedup state, or None if missing, unreadable or from another version."""
+    try:
+        state = json.loads(src.with_name(STATE_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return state if state.get("version") == STATE_VERSION else None
+
+
+def outputs_intact(src: Path, state: dict) -> bool:
+    """True if the outputs on disk are the ones the state recorded."""
+    for name, digest in state["outputs"].items():
+        output = src.with_name(name)
+        if not output.exists() or sha256_file(output) != digest:
+            return False
+    return True
+
+
+def iter_text_windows(path: Path) -> Iterator[str]:
     """
-    Write dictionary1.json and deduplicated.json next to the source file, with meta counts.
+    Decode a source file window by window from a memory map.
+    - Same characters as read_text(encoding="utf-8", errors="replace"): the incremental
+      decoders carry split UTF-8 sequences and "\r\n" pairs across window edges.
     """
-    output1 = path.with_name("dictionary1.json")
-    output2 = path.with_name("deduplicated.json")
-    output1.write_text(json.dumps(dictionary1, indent=2), encoding="utf-8")
-    output2.write_text(json.dumps(dictionary2, indent=2), encoding="utf-8")
+    size = path.stat().st_size
+    if size == 0:
+        return  # empty files cannot be memory-mapped
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(errors="replace"), translate=True)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for start in range(0, size, STREAM_WINDOW):
+            end = min(start + STREAM_WINDOW, size)
+            yield decoder.decode(mm[start:end], final=end == size)
+
+
+def safe_cut(buffer: str) -> int:
+    """
+    Largest n such that buffer[:n] can be parsed on its own (see appendable), else 0.
+    - Assumes everything before the buffer was itself cut at such a point.
+    """
+    cut = len(buffer)
+    while cut > 0:
+        # Cut just after whitespace, so no raw URL is split.
+        cut = max(buffer.rfind("\n", 0, cut), buffer.rfind(" ", 0, cut)) + 1
+        if cut == 0:
+            break
+        last_open = buffer.rfind("[", 0, cut)
+        if last_open > buffer.rfind("]", 0, cut):
+            cut = last_open  # "[" still waiting for its "]"
+            continue
+        last_target = buffer.rfind("](", 0, cut)
+        if last_target != -1 and buffer.find(")", last_target + 2, cut) == -1:
+            cut = last_target + 1  # "](" still waiting for its ")"
+            continue
+        return cut
+    return 0
+
+
+def iter_segments(path: Path) -> Iterator[tuple[int, str]]:
+    """
+    Yield (character offset, text) pieces that can each be parsed on their own.
+    - Windows overlap: whatever follows the last safe cut is carried into the next window,
+      so a link that spans a window edge is parsed whole and offsets stay exact.
+    """
+    offset = 0
+    carry = ""
+    for window in iter_text_windows(path):
+        carry += window
+        cut = safe_cut(carry)
+        if cut:
+            yield offset, carry[:cut]
+            offset += cut
+            carry = carry[cut:]
+    if carry:
+        yield offset, carry
+
+
+class JsonObjectWriter:
+    """Writes a JSON object member by member; the file equals json.dumps(obj, indent=2)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8")
+
+    def add(self, key: str, value: dict) -> None:
+        """Append one member (values are indented one level, as json.dumps would)."""
+        member = json.dumps(key) + ": " + json.dumps(value, indent=2).replace("\n", "\n  ")
+        self._file.write(("{\n  " if self.count == 0 else ",\n  ") + member)
+        self.count += 1
+
+    def close(self) -> str:
+        """Finish the object and return the file's SHA-256."""
+        self._file.write("\n}" if self.count else "{}")
+        self._file.close()
+        return sha256_file(self.path)
+
+
+def stream_folder(
+    src: Path, index: GlobalUrlIndex | None = None, parquet: bool = False
+) -> tuple[int, int, int, bool, dict[str, str]]:
+    """
+    Streaming twin of parse + mark_duplicates + save_output for very large sources.
+    - Pass 1 scans memory-mapped windows and spools each link to a temp file; only the
+      duplicate groups (bare URL -> link numbers) stay in memory.
+    - Pass 2 replays the spool and writes both JSON files (and, with `parquet`, the
+      Parquet rows) entry by entry.
+    - With an index, a third replay feeds the vendor's rows to it.
+    - Returns (links, deduplicated, characters, appendable, output hashes).
+    """
+    groups: dict[str, list[int]] = defaultdict(list)
+    links = 0
+    chars = 0
+    last_segment = ""
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as spool:
+        for offset, segment in iter_segments(src):
+            for entry in extract_entries(segment):
+                links += 1
+                groups[entry["bare"]].append(links)
+                record = [entry["original form"], entry["bare"], entry["start"] + offset, entry["end"] + offset]
+                spool.write(json.dumps(record) + "\n")
+            chars = offset + len(segment)
+            last_segment = segment
+        spool.seek(0)
+
+        writer1 = JsonObjectWriter(src.with_name("dictionary1.json"))
+        writer2 = JsonObjectWriter(src.with_name("deduplicated.json"))
+        table = ParquetLinkWriter(src.with_name(PARQUET_NAME), src.parent.name) if parquet else None
+        group_ids = {bare: group_id for group_id, bare in enumerate(groups)}  # first-occurrence order
+        for number, line in enumerate(spool, start=1):
+            original, bare, start, end = json.loads(line)
+            payload = link_payload(original, bare, start, end)
+            members = groups[bare]
+            # Same rules as mark_duplicates: list the other members, first occurrence wins.
+            if len(members) > 1:
+                payload["duplicate list"] = [f"link{m}" for m in members if m != number]
+            payload["selected"] = 1 if members[0] == number else 0
+            writer1.add(f"link{number}", payload)
+            if payload["selected"]:
+                writer2.add(f"link{number}", payload)
+            if table is not None:
+                table.add(f"link{number}", payload, group_ids[bare])
+        outputs = {"dictionary1.json": writer1.close(), "deduplicated.json": writer2.close()}
+        if table is not None:
+            table.close()
+            outputs[PARQUET_NAME] = sha256_file(table.path)
+
+        if index is not None:
+
+            def spooled_rows() -> Iterator[tuple[str, str, str, int]]:
+                spool.seek(0)
+                for number, line in enumerate(spool, start=1):
+                    original, bare, _, _ = json.loads(line)
+                    yield f"link{number}", original, bare, 1 if groups[bare][0] == number else 0
+
+            index.replace_vendor(src.parent.name, spooled_rows())
+    # Earlier segments all end at safe cuts, so the last one decides for the whole text.
+    return links, writer2.count, chars, appendable(last_segment), outputs
+
+
+def dedup_folder(
+    src: Path, full: bool = False, stream: bool = False, index_path: Path | None = None, parquet: bool = False
+) -> tuple[int, int, str]:
+    """
+    Process one source file; return (links found, deduplicated, action). Runs in workers with --jobs.
+    - "unchanged": source, rules and outputs match the state record; nothing is written.
+    - "appended": the source only grew at the end; just the new tail is parsed and merged.
+    - "streamed": parsed from scratch in streaming mode (`stream`, or a source over STREAM_THRESHOLD).
+    - "rebuilt": anything else (or `full`), parsed from scratch.
+    - With `index_path`, the vendor's links are written to the global URL index.
+    - With `parquet`, dedup_links.parquet is written too (and its absence forces a rebuild).
+    """
+    vendor = src.parent.name
+    state = None if full else load_state(src)
+    size = src.stat().st_size
+    rules = fingerprint()
+    streaming = stream or size >= STREAM_THRESHOLD
+    has_outputs = state and (not parquet or PARQUET_NAME in state["outputs"]) and outputs_intact(src, state)
+    if has_outputs and state["rules"] == rules:
+        if size == state["source_bytes"] and sha256_file(src) == state["source_sha256"]:
+            if index_path:
+                with GlobalUrlIndex(index_path) as index:
+                    if not index.has_vendor(vendor):  # index created or reset since the last run
+                        dictionary1 = json.loads(src.with_name("dictionary1.json").read_text(encoding="utf-8"))
+                        index.replace_vendor(vendor, index_rows(dictionary1))
+            return state["links"], state["deduplicated"], "unchanged"
+        grew = (
+            not streaming  # merging loads dictionary1.json, which is what streaming avoids
+            and state["appendable"]
+            and size > state["source_bytes"]
+            and sha256_file(src, state["source_bytes"]) == state["source_sha256"]
+        )
+    else:
+        grew = False
+
+    if streaming:
+        if index_path:
+            with GlobalUrlIndex(index_path) as index:
+                found, deduplicated, chars, can_append, outputs = stream_folder(src, index, parquet)
+        else:
+            found, deduplicated, chars, can_append, outputs = stream_folder(src, parquet=parquet)
+        write_state(src, rules, size, chars, can_append, found, deduplicated, outputs)
+        return found, deduplicated, "streamed"
+
+    text = src.read_text(encoding="utf-8", errors="replace")
+    if grew:
+        # Old text ended on whitespace, so it decodes to the same characters on its own.
+        dictionary1 = json.loads(src.with_name("dictionary1.json").read_text(encoding="utf-8"))
+        old_chars = state["source_chars"]
+        dictionary1.update(build_dictionary1(text[old_chars:], offset=old_chars, first_link=len(dictionary1) + 1))
+        action = "appended"
+    else:
+        dictionary1 = build_dictionary1(text)
+        action = "rebuilt"
+    # Duplicate lists and winners are regrouped over all links, old and new.
+    dictionary1 = mark_duplicates(dictionary1)
+    dictionary2 = build_dictionary2(dictionary1)
+    outputs = save_output(src, dictionary1, dictionary2)
+    if parquet:
+        write_parquet(src.with_name(PARQUET_NAME), vendor, dictionary1)
+        outputs[PARQUET_NAME] = sha256_file(src.with_name(PARQUET_NAME))
+    if index_path:
+        with GlobalUrlIndex(index_path) as index:
+            index.replace_vendor(vendor, index_rows(dictionary1))
+    write_state(src, rules, size, len(text), appendable(text), len(dictionary1), len(dictionary2), outputs)
+    return len(dictionary1), len(dictionary2), action
+
+
+def write_state(
+    src: Path,
+    rules: str,
+    size: int,
+    chars: int,
+    can_append: bool,
+    links: int,
+    deduplicated: int,
+    outputs: dict[str, str],
+) -> None:
+    """Record what this run read and wrote, for the next run's skip/append decision."""
+    state = {
+        "version": STATE_VERSION,
+        "rules": rules,
+        "source_sha256": sha256_file(src, size),
+        "source_bytes": size,
+        "source_chars": chars,
+        "appendable": can_append,
+        "links": links,
+        "deduplicated": deduplicated,
+        "outputs": outputs,
+    }
+    src.with_name(STATE_NAME).write_text(json.dumps(state, indent=2), encoding="utf-8")
 
 
 def main() -> None:
@@ -243,19 +511,85 @@ def main() -> None:
         default=Path("."),
         help="Base directory containing subfolders with original sources.txt files (default: current directory).",
     )
+    parser.add_argument(
+        "--url-rules",
+        type=Path,
+        default=None,
+        help="JSON file with host aliases and tracking-parameter prefixes (default: url_rules.json next to the scripts).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Vendor folders processed in parallel worker processes (default: 1; 0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help=f"Re-parse every folder, ignoring {STATE_NAME} records.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Parse every source in streaming mode (memory-mapped windows, entries written as they are built); "
+        f"sources over {STREAM_THRESHOLD // 2**20} MiB always are.",
+    )
+    parser.add_argument(
+        "--url-index",
+        type=Path,
+        default=None,
+        help=f"Cross-vendor SQLite URL index to update (default: <data-dir>/{INDEX_FILE_NAME}).",
+    )
+    parser.add_argument(
+        "--no-url-index",
+        action="store_true",
+        help="Do not update the cross-vendor URL index.",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help=f"Also write {PARQUET_NAME} (one typed row per link; needs pyarrow).",
+    )
     args = parser.parse_args()
+    if args.parquet and not PYARROW_AVAILABLE:
+        raise SystemExit("--parquet needs the 'pyarrow' package.")
+    if args.url_rules:
+        configure(args.url_rules)
 
-    source_files = list(args.data_dir.glob("*/original sources.txt"))
+    source_files = sorted(args.data_dir.glob("*/original sources.txt"))  # stable order across runs
     if not source_files:
         raise SystemExit("No 'original sources.txt' files found under the provided data directory.")
-
-    for src in source_files:
+    index_path = None if args.no_url_index else args.url_index or args.data_dir / INDEX_FILE_NAME
+    if index_path:
+        GlobalUrlIndex(index_path).close()  # create the schema once, before workers open it
+
+    failed = 0
+    for src, outcome in run_folders(
+        dedup_folder,
+        source_files,
+        args.jobs,
+        args.url_rules,
+        full=args.full,
+        stream=args.stream,
+        index_path=index_path,
+        parquet=args.parquet,
+    ):
         print(f"Processing {src} ...")
-        dictionary1, dictionary2 = process_file(src)
-        save_output(src, dictionary1, dictionary2)
+        if isinstance(outcome, Exception):
+            failed += 1
+            print(f"  FAILED: {outcome!r}")
+            continue
+        found, deduplicated, action = outcome
         print(
-            f"  links found: {len(dictionary1)} | deduplicated: {len(dictionary2)} | output: {src.with_name('deduplicated.json')}"
+            f"  links found: {found} | deduplicated: {deduplicated} | {action} | "
+            f"output: {src.with_name('deduplicated.json')}"
         )
+    if index_path:
+        with GlobalUrlIndex(index_path) as index:
+            shared = index.shared()
+        print(f"URL index: {len(shared)} bare URLs cited by 2+ vendors | {index_path}")
+    if failed:
+        raise SystemExit(f"{failed} of {len(source_files)} folder(s) failed.")
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ For each `original sources.txt`, the script builds:
 - dictionary2: only the selected representatives per duplicate group.
 
 Usage:
-    python deduplicate_sources.py [--data-dir .]
+    python deduplicate_sources.py [--data-dir .] [--jobs N]
 
 Notes:
 - Character positions are 0-based and end positions are inclusive for easy reference
@@ -22,7 +22,11 @@ import json
 import re
 from collections import defaultdict
 from pathlib import Path
-from urllib.parse import urlparse
+
+from dedup_parquet import PARQUET_NAME, PYARROW_AVAILABLE, write_parquet
+from dedup_runner import run_folders
+from global_index import INDEX_FILE_NAME, GlobalUrlIndex, index_rows
+from url_normalize import configure, normalize_url
 
 LINK_PATTERN = re.compile(r"\[(?P<link_text>[^\]]+)\]\((?P<link_target>[^)]+)\)")
 # Raw URL pattern captures:
@@ -41,54 +45,6 @@ RAW_URL_PATTERN = re.compile(
 )
 
 
-def normalize_url(url: str) -> str:
-    """Return a bare-minimum form of the URL for duplicate detection."""
-    candidate = url.strip()
-    # Strip surrounding markdown emphasis characters (e.g., **url** or *url*)
-    candidate = re.sub(r"^[*_]+", "", candidate)
-    candidate = re.sub(r"[*_]+$", "", candidate)
-    # Strip trailing punctuation that often trails links
-    candidate = candidate.rstrip(").,;")
-    if not re.match(r"^[a-zA-Z][a-zA-Z0-9+.-]*://", candidate):
-        candidate = f"http://{candidate}"
-
-    parsed = urlparse(candidate)
-    netloc = parsed.netloc.lower()
-
-    if netloc.startswith("www."):
-        netloc = netloc[4:]
-
-    # Host aliases (add more as needed)
-    host_aliases = {
-        "agfa.com": "agfahealthcare.com",
-        "www.agfa.com": "agfahealthcare.com",
-    }
-    netloc = host_aliases.get(netloc, netloc)
-
-    if netloc.endswith(":80"):
-        netloc = netloc[: -len(":80")]
-    if netloc.endswith(":443"):
-        netloc = netloc[: -len(":443")]
-
-    path = re.sub(r"/{2,}", "/", parsed.path or "").rstrip("/")
-
-    # Strip tracking params and fragments
-    tracking_prefixes = ("utm_", "fbclid", "gclid", "mc_cid", "mc_eid", "vero_id")
-    query_pairs = []
-    if parsed.query:
-        for key, value in [q.split("=", 1) if "=" in q else (q, "") for q in parsed.query.split("&") if q]:
-            if key.startswith(tracking_prefixes):
-                continue
-            query_pairs.append((key, value))
-    query = "&".join(f"{k}={v}" if v else k for k, v in query_pairs)
-
-    normalized = netloc + path
-    if query:
-        normalized = f"{normalized}?{query}"
-
-    return normalized
-
-
 def extract_summary(text: str, start: int, end: int) -> str:
     """
     Extract the summary block between `start` and `end` offsets.
@@ -96,16 +52,18 @@ def extract_summary(text: str, start: int, end: int) -> str:
     Captures text after a link until the next link start (end offset provided),
     allowing multi-paragraph summaries. Trailing/leading blank lines are trimmed.
     """
-    chunk = text[start:end]
-    lines = [line.rstrip() for line in chunk.splitlines()]
-    # Trim leading/trailing blanks
-    while lines and lines[0].strip() == "":
-        lines.pop(0)
-    while lines and lines[-1].strip() == "":
-        lines.pop()
-    if lines:
-        lines[0] = lines[0].lstrip(" )]\t")
-    return "\n".join(lines).strip()
+    lines = text[start:end].splitlines()
+    # Trim leading/trailing blank lines by moving two indices (no list pops).
+    first, last = 0, len(lines)
+    while first < last and not lines[first].strip():
+        first += 1
+    while last > first and not lines[last - 1].strip():
+        last -= 1
+    if first == last:
+        return ""
+    kept = [line.rstrip() for line in lines[first:last]]
+    kept[0] = kept[0].lstrip(" )]\t")
+    return "\n".join(kept).strip()
 
 
 def build_dictionary1(text: str) -> dict[str, dict]:
@@ -121,8 +79,9 @@ def build_dictionary1(text: str) -> dict[str, dict]:
         original_form = match.group("link_target").strip()
         start_pos = match.start("link_target")
         end_pos = match.end("link_target") - 1  # inclusive
-        occupied_ranges.append((start_pos, end_pos))
+        # Text span first: it precedes the target, which keeps occupied_ranges in document order.
         occupied_ranges.append((match.start("link_text"), match.end("link_text") - 1))
+        occupied_ranges.append((start_pos, end_pos))
         entries.append(
             {
                 "original form": original_form,
@@ -131,15 +90,20 @@ def build_dictionary1(text: str) -> dict[str, dict]:
             }
         )
 
-    # Next, capture raw URLs not already covered by markdown link targets.
-    def overlaps(span: tuple[int, int]) -> bool:
-        return any(not (span[1] < s or span[0] > e) for s, e in occupied_ranges)
-
+    # Next, capture raw URLs not already covered by markdown link spans.
+    # Markdown spans come out of finditer in document order and never overlap, and raw
+    # matches also arrive left to right, so one forward-moving cursor over the spans is
+    # enough (linear in the number of matches instead of matches x spans). Raw matches
+    # never overlap each other either, so accepted raw spans need no bookkeeping.
+    span_idx = 0
     for match in RAW_URL_PATTERN.finditer(text):
         start_pos = match.start("url")
         end_pos = match.end("url") - 1
-        if overlaps((start_pos, end_pos)):
-            continue
+        # Skip markdown spans that end before this match starts; later matches start even later.
+        while span_idx < len(occupied_ranges) and occupied_ranges[span_idx][1] < start_pos:
+            span_idx += 1
+        if span_idx < len(occupied_ranges) and occupied_ranges[span_idx][0] <= end_pos:
+            continue  # overlaps a markdown link
         original_form = match.group("url").strip()
         entries.append(
             {
@@ -148,7 +112,6 @@ def build_dictionary1(text: str) -> dict[str, dict]:
                 "end": end_pos,
             }
         )
-        occupied_ranges.append((start_pos, end_pos))
 
     # Sort by position to keep deterministic link numbering.
     entries.sort(key=lambda x: x["start"])
@@ -157,12 +120,15 @@ def build_dictionary1(text: str) -> dict[str, dict]:
     for entry in entries:
         entry["bare"] = normalize_url(entry["original form"])
 
-    # Populate summaries for every entry using the following text until the next link.
-    for i, entry in enumerate(entries):
-        j = i + 1
-        while j < len(entries) and entries[j]["bare"] == entry["bare"]:
-            j += 1
-        next_start = entries[j]["start"] if j < len(entries) else len(text)
+    # Populate summaries for every entry using the following text until the next link
+    # with a different bare form. Walking backwards, that boundary is either the next
+    # entry's start or (same bare form) the boundary already found for the next entry,
+    # so each span is computed once instead of rescanning runs of repeated links.
+    next_start = len(text)
+    for i in range(len(entries) - 1, -1, -1):
+        entry = entries[i]
+        if i + 1 < len(entries) and entries[i + 1]["bare"] != entry["bare"]:
+            next_start = entries[i + 1]["start"]
         entry["summary"] = extract_summary(text, entry["end"] + 1, next_start)
 
     for idx, entry in enumerate(entries):
@@ -192,14 +158,14 @@ def mark_duplicates(dictionary1: dict[str, dict]) -> dict[str, dict]:
         for key in members:
             dictionary1[key]["duplicate list"] = [m for m in members if m != key]
 
+    # Winner key per link, computed once: (has a non-blank summary, summary length).
+    summary_rank: dict[str, tuple[bool, int]] = {}
+    for key, payload in dictionary1.items():
+        summary = payload.get("accompanying RAG summary + metadata string", "")
+        summary_rank[key] = (len(summary.strip()) > 0, len(summary))
+
     for members in groups.values():
-        winner = max(
-            members,
-            key=lambda k: (
-                len(dictionary1[k].get("accompanying RAG summary + metadata string", "").strip()) > 0,
-                len(dictionary1[k].get("accompanying RAG summary + metadata string", "")),
-            ),
-        )
+        winner = max(members, key=summary_rank.__getitem__)
         for key in members:
             dictionary1[key]["selected"] = 1 if key == winner else 0
 
@@ -226,6 +192,22 @@ def save_output(path: Path, dictionary1: dict[str, dict], dictionary2: dict[str,
     output2.write_text(json.dumps(dictionary2, indent=2), encoding="utf-8")
 
 
+def dedup_folder(src: Path, index_path: Path | None = None, parquet: bool = False) -> tuple[int, int]:
+    """
+    Process one source file end to end; return (links found, deduplicated). Runs in workers with --jobs.
+    - With `index_path`, the vendor's links are written to the global URL index.
+    - With `parquet`, dedup_links.parquet is written next to the JSON outputs.
+    """
+    dictionary1, dictionary2 = process_file(src)
+    save_output(src, dictionary1, dictionary2)
+    if parquet:
+        write_parquet(src.with_name(PARQUET_NAME), src.parent.name, dictionary1)
+    if index_path:
+        with GlobalUrlIndex(index_path) as index:
+            index.replace_vendor(src.parent.name, index_rows(dictionary1))
+    return len(dictionary1), len(dictionary2)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Deduplicate links inside original sources.txt files.")
     parser.add_argument(
@@ -234,19 +216,66 @@ def main() -> None:
         default=Path("."),
         help="Base directory containing subfolders with original sources.txt files (default: current directory).",
     )
+    parser.add_argument(
+        "--url-rules",
+        type=Path,
+        default=None,
+        help="JSON file with host aliases and tracking-parameter prefixes (default: url_rules.json next to the scripts).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Vendor folders processed in parallel worker processes (default: 1; 0 = one per CPU).",
+    )
+    parser.add_argument(
+        "--url-index",
+        type=Path,
+        default=None,
+        help=f"Cross-vendor SQLite URL index to update (default: <data-dir>/{INDEX_FILE_NAME}).",
+    )
+    parser.add_argument(
+        "--no-url-index",
+        action="store_true",
+        help="Do not update the cross-vendor URL index.",
+    )
+    parser.add_argument(
+        "--parquet",
+        action="store_true",
+        help=f"Also write {PARQUET_NAME} (one typed row per link; needs pyarrow).",
+    )
     args = parser.parse_args()
+    if args.parquet and not PYARROW_AVAILABLE:
+        raise SystemExit("--parquet needs the 'pyarrow' package.")
+    if args.url_rules:
+        configure(args.url_rules)
 
-    source_files = list(args.data_dir.glob("*/original sources.txt"))
+    source_files = sorted(args.data_dir.glob("*/original sources.txt"))  # stable order across runs
     if not source_files:
         raise SystemExit("No 'original sources.txt' files found under the provided data directory.")
-
-    for src in source_files:
+    index_path = None if args.no_url_index else args.url_index or args.data_dir / INDEX_FILE_NAME
+    if index_path:
+        GlobalUrlIndex(index_path).close()  # create the schema once, before workers open it
+
+    failed = 0
+    for src, outcome in run_folders(
+        dedup_folder, source_files, args.jobs, args.url_rules, index_path=index_path, parquet=args.parquet
+    ):
         print(f"Processing {src} ...")
-        dictionary1, dictionary2 = process_file(src)
-        save_output(src, dictionary1, dictionary2)
+        if isinstance(outcome, Exception):
+            failed += 1
+            print(f"  FAILED: {outcome!r}")
+            continue
+        found, deduplicated = outcome
         print(
-            f"  links found: {len(dictionary1)} | deduplicated: {len(dictionary2)} | output: {src.with_name('deduplicated.json')}"
+            f"  links found: {found} | deduplicated: {deduplicated} | output: {src.with_name('deduplicated.json')}"
         )
+    if index_path:
+        with GlobalUrlIndex(index_path) as index:
+            shared = index.shared()
+        print(f"URL index: {len(shared)} bare URLs cited by 2+ vendors | {index_path}")
+    if failed:
+        raise SystemExit(f"{failed} of {len(source_files)} folder(s) failed.")
 
 
 if __name__ == "__main__":
@@ -5,29 +5,71 @@ Overall goal (plain English)
 - You tell the script where deduplicated.json lives.
 - It reads all the links, downloads files into ./files, downloads pages into
   ./web pages, and logs what happened into fetch_manifest.json.
-- It uses many threads for speed, and can use Playwright to render JavaScript
-  pages if needed.
+- Every finished link is also appended to fetch_manifest.jsonl right away, so
+  a crash or Ctrl-C keeps the progress. `--resume` skips links already `ok`;
+  `--retry-failed` re-queues only `failed`/`pending_render` links.
+- It fetches links concurrently on one asyncio event loop (httpx, pooled
+  keep-alive connections per host, optional HTTP/2), and can use Playwright to
+  render JavaScript pages if needed. Renders go through a small pool of
+  long-lived browsers (one isolated context per URL) instead of launching
+  Chromium per link. The default "lean" render mode aborts images, media,
+  fonts and tracker scripts, and waits for DOM-ready plus a short bounded
+  idle instead of a full `networkidle`.
+- A per-host scheduler keeps us polite to each vendor domain: a concurrency
+  cap that halves on 429/503 and creeps back up on success, a token-bucket
+  rate limit, Retry-After handling, and a circuit breaker that fails the
+  rest of a host's links fast once it keeps refusing connections.
+- Each link costs one GET: the response headers and first bytes decide whether
+  it is a file or a web page, then the body streams straight to disk.
+- Large files (brochures, FOI packs, manuals) served with `Accept-Ranges`
+  download over several range requests at once into a resumable `.part`
+  file; a per-file size cap keeps one huge binary from stalling a worker.
+- Every record carries phase timings (queue, connect incl. DNS, TLS,
+  time-to-first-byte, transfer, render), bytes, redirect count and final
+  URL; fetch_stats.json next to each manifest has p50/p95/p99 per phase and
+  per host plus the slowest URLs, for comparing runs.
+- Bodies land once in a content-addressed store (see fetch_store.py, default
+  `.fetch_store` next to the vendor folders); files/ and web pages/ hold
+  readable hard links into it. Re-runs send If-None-Match/If-Modified-Since
+  and skip bodies the server says are unchanged.
+- If the dedup scripts built a cross-vendor URL index (global_index.py), a
+  URL cited by several vendors is fetched once per run and linked into each
+  of them; outcomes are written back to the index.
 
 Where it fits
 - Point --base-dir at any vendor folder that contains deduplicated.json.
 - The script writes outputs into that same folder.
+- Or point --data-root at a folder of vendor folders: every
+  `*/deduplicated.json` is fetched in one run through one shared pool, with
+  per-vendor outputs and manifests.
 """
 
 from __future__ import annotations
 
 import argparse  # read command-line flags
+import importlib.util  # check optional packages (h2 for HTTP/2)
 import json  # read/write JSON files
 import mimetypes  # guess file extensions
 import sys  # check platform
 import time  # measure how long things take
 import asyncio  # set event loop policy on Windows
+from collections import defaultdict  # group timings by host
+from contextlib import asynccontextmanager  # scheduler slots as `async with`
+from dataclasses import dataclass, field  # bundle run settings / vendor jobs
+from email.utils import parsedate_to_datetime  # parse HTTP-date Retry-After values
 from pathlib import Path  # handle file system paths
-from concurrent.futures import ThreadPoolExecutor, as_completed  # run work in threads
+from urllib.parse import urlsplit  # pull hostnames out of request URLs
+from typing import AsyncIterator  # type for streamed response bodies
 
-import requests  # HTTP library for GET/HEAD
+import httpx  # async HTTP client with connection pooling
+
+from dedup_parquet import PARQUET_NAME, PYARROW_AVAILABLE, load_links  # columnar dedup output
+from fetch_store import BlobStore, BlobWriter  # content-addressed download store
+from global_index import INDEX_FILE_NAME, GlobalUrlIndex  # cross-vendor URL index (dedup scripts)
 
 try:
-    from playwright.sync_api import sync_playwright  # browser automation
+    from playwright.async_api import Browser, Playwright, Route, async_playwright  # browser automation
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
     PLAYWRIGHT_AVAILABLE = True  # flag if Playwright is installed
 except ImportError:
@@ -43,12 +85,175 @@ UA = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
     "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 )
-# Network timeout in seconds for HEAD/GET/navigation.
+# Network timeout in seconds for GET/navigation.
 TIMEOUT = 10
-# How many concurrent HTTP workers to run.
-MAX_HTTP_WORKERS = 32
-# How many concurrent Playwright render workers to run.
-MAX_RENDER_WORKERS = 20
+# How many HTTP requests may be in flight at once (async engine, one event loop).
+MAX_HTTP_CONCURRENCY = 1000
+# Max requests in flight to a single host (the adaptive limit starts here).
+PER_HOST_CONCURRENCY = 6
+# Sustained requests per second per host (token bucket refill rate; 0 = no limit).
+PER_HOST_RATE = 4.0
+# Short bursts allowed above the per-host rate (token bucket size).
+PER_HOST_BURST = 8
+# Consecutive connect errors after which a host's remaining links fail fast.
+BREAKER_THRESHOLD = 3
+# Retries for a URL answered with a throttling status.
+MAX_RETRIES = 3
+# Statuses that mean "slow down and try again".
+RETRY_STATUSES = frozenset({429, 503})
+# Longest Retry-After we are willing to wait, in seconds; longer means give up.
+MAX_RETRY_AFTER = 120
+# Backoff base in seconds when a throttling response has no Retry-After.
+DEFAULT_BACKOFF = 2.0
+# Append-only per-URL progress log written next to fetch_manifest.json.
+MANIFEST_LOG_NAME = "fetch_manifest.jsonl"
+# Run modes: fetch everything, skip links already ok, or only redo failed/pending ones.
+RUN_MODES = ("fresh", "resume", "retry-failed")
+# Statuses that --retry-failed re-queues.
+RETRYABLE_STATUSES = ("failed", "pending_render")
+# Per-run latency report written next to fetch_manifest.json.
+STATS_NAME = "fetch_stats.json"
+# How many of the slowest URLs the latency report lists.
+SLOWEST_URLS = 20
+# httpx/httpcore trace steps -> timing phase (httpcore resolves DNS inside connect_tcp).
+TRACE_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.start_tls": "tls",
+    "http11.receive_response_headers": "ttfb",
+    "http2.receive_response_headers": "ttfb",
+}
+# Phases reported in fetch_stats.json, in pipeline order.
+STAT_PHASES = ("queue", "connect", "tls", "ttfb", "transfer", "render", "total")
+# Store folder name, created next to the vendor folders unless --store-dir is given.
+STORE_DIR_NAME = ".fetch_store"
+# Upper bound on idle keep-alive connections kept around for reuse.
+MAX_KEEPALIVE_CONNECTIONS = 200
+# Seconds an idle keep-alive connection stays open before it is dropped.
+KEEPALIVE_EXPIRY = 30
+# Chunk size in bytes when streaming downloads to disk.
+CHUNK_SIZE = 64 * 1024
+# Files at least this big (and served with Accept-Ranges: bytes) use parallel range requests.
+LARGE_FILE_THRESHOLD = 16 * 1024 * 1024
+# Range connections per large file (on top of the scheduler slot that found it).
+RANGE_CONNECTIONS = 4
+# Bytes per range request; also the unit a resumed download skips.
+RANGE_SEGMENT_SIZE = 8 * 1024 * 1024
+# Read size for range segments (bigger chunks, fewer writes).
+LARGE_CHUNK_SIZE = 1024 * 1024
+# Attempts per range segment before the whole file fails (the .part is kept for next run).
+SEGMENT_ATTEMPTS = 3
+# Per-file size cap in bytes (0 = no cap).
+MAX_FILE_SIZE = 1024 * 1024 * 1024
+# How many leading body bytes to look at when deciding file vs. HTML.
+SNIFF_BYTES = 1024
+# Content-Type families that mean "save as a file".
+FILE_CTYPE_PREFIXES = ("application/", "image/", "audio/", "video/")
+# Content types under application/ that are really web pages.
+HTML_CTYPES = ("application/xhtml+xml",)
+# Leading-byte signatures of downloadable documents -> extension to use if the name has none.
+ZIP_SIGNATURE = b"PK\x03\x04"  # ZIP container: also DOCX/XLSX/PPTX
+OLE2_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # legacy Office (OLE2): DOC/XLS/PPT
+FILE_SIGNATURES = (
+    (b"%PDF-", ".pdf"),
+    (ZIP_SIGNATURE, ".zip"),
+    (OLE2_SIGNATURE, None),  # no safe default: .doc would be wrong for XLS/PPT
+    (b"{\\rtf", ".rtf"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"GIF8", ".gif"),
+)
+# Containers -> (name found in the first bytes, extension): ZIP member paths, OLE2 stream names.
+CONTAINER_HINTS = {
+    ZIP_SIGNATURE: ((b"word/", ".docx"), (b"xl/", ".xlsx"), (b"ppt/", ".pptx")),
+    OLE2_SIGNATURE: (
+        ("WordDocument".encode("utf-16-le"), ".doc"),
+        ("Workbook".encode("utf-16-le"), ".xls"),
+        ("PowerPoint Document".encode("utf-16-le"), ".ppt"),
+    ),
+}
+# Content types too vague to pick a container's extension from.
+GENERIC_CTYPES = (
+    "",
+    "application/octet-stream",
+    "binary/octet-stream",
+    "application/download",
+    "application/force-download",
+    "application/x-download",
+    "text/html",
+    "text/plain",
+)
+# URL suffixes that say nothing about a downloaded document's real type.
+WEB_SUFFIXES = ("", ".html", ".htm", ".php", ".asp", ".aspx", ".jsp", ".cfm")
+# Leading markup that means "this is a web page" whatever the headers say.
+HTML_MARKERS = (b"<!doctype html", b"<html", b"<head", b"<body")
+# How many Chromium processes the render service keeps alive.
+RENDER_BROWSERS = 2
+# How many pages (one isolated context each) a single browser renders at once.
+PAGES_PER_BROWSER = 8
+# Relaunch a browser after it has served this many pages (caps leaks/bloat).
+RECYCLE_AFTER_PAGES = 100
+# Render modes: "lean" blocks heavy/tracking requests and bounds idle waits; "full" loads everything.
+RENDER_MODES = ("lean", "full")
+# Lean mode: after DOM-ready, wait at most this many ms for the network to go idle.
+RENDER_IDLE_BUDGET_MS = 3000
+# Pause after scrolling so lazy content can attach (lean vs. full mode).
+RENDER_SETTLE_MS = {"lean": 500, "full": 2000}
+# Request types that never change the saved HTML, aborted in lean mode.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+# Ad/analytics hosts (a request to the host or any subdomain is aborted in lean mode).
+TRACKER_HOSTS = (
+    "googletagmanager.com",
+    "google-analytics.com",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "doubleclick.net",
+    "adservice.google.com",
+    "connect.facebook.net",
+    "bat.bing.com",
+    "clarity.ms",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "criteo.net",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "hotjar.com",
+    "segment.com",
+    "segment.io",
+    "snap.licdn.com",
+    "ads-twitter.com",
+    "impactcdn.com",
+    "survicate.com",
+    "pdst.fm",
+    "s.yimg.com",
+    "nr-data.net",
+)
+# Script names that identify trackers even when served from first-party/CDN hosts.
+TRACKER_PATH_MARKERS = ("gtm.js", "fbevents.js", "prebid", "bat.js", "analytics.js", "gtag/js")
+
+
+@dataclass
+class FetchConfig:
+    """Knobs for one fetch run (defaults mirror the module constants / CLI defaults)."""
+
+    concurrency: int = MAX_HTTP_CONCURRENCY  # global in-flight HTTP requests
+    http2: bool = False  # negotiate HTTP/2 where possible
+    per_host: int = PER_HOST_CONCURRENCY  # max in-flight requests per host
+    host_rate: float = PER_HOST_RATE  # requests/second per host (0 = unlimited)
+    host_burst: int = PER_HOST_BURST  # token bucket size per host
+    breaker_threshold: int = BREAKER_THRESHOLD  # connect errors before a host fails fast
+    max_retries: int = MAX_RETRIES  # retries on 429/503
+    render_browsers: int = RENDER_BROWSERS  # Chromium processes for renders
+    pages_per_browser: int = PAGES_PER_BROWSER  # concurrent pages per browser
+    recycle_after: int = RECYCLE_AFTER_PAGES  # relaunch a browser after this many pages
+    render_mode: str = "lean"  # "lean" or "full"
+    store_dir: Path | None = None  # content-addressed store (None = <vendor folder>/../.fetch_store)
+    run_mode: str = "fresh"  # "fresh", "resume" or "retry-failed"
+    max_file_size: int = MAX_FILE_SIZE  # bytes per file before giving up (0 = no cap)
+    range_connections: int = RANGE_CONNECTIONS  # parallel range requests per large file
+    url_index: Path | None = None  # cross-vendor URL index (None = <data folder>/global_url_index.sqlite if present)
 
 
 def clean_url(url: str) -> str:
@@ -64,16 +269,138 @@ def clean_url(url: str) -> str:
     return url
 
 
-def classify_via_headers(url: str) -> tuple[str, str]:
+def read_manifest_log(path: Path) -> dict[str, dict]:
     """
-    Return (content-type, content-disposition) from a HEAD request.
-    Falls back to empty strings on failure (some servers block HEAD).
+    Load the latest record per URL from a JSONL manifest (later lines win).
+    A torn last line from a crash mid-write is ignored.
     """
-    try:
-        r = requests.head(url, allow_redirects=True, timeout=TIMEOUT, headers={"User-Agent": UA})  # send HEAD
-        return r.headers.get("Content-Type", "").lower(), r.headers.get("Content-Disposition", "")  # pull headers
-    except Exception:
-        return "", ""  # on failure, return blanks
+    records: dict[str, dict] = {}
+    if not path.exists():
+        return records
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # partial line
+            if rec.get("url"):
+                records[rec["url"]] = rec
+    return records
+
+
+class ManifestLog:
+    """
+    Append-only JSONL progress log for one vendor folder.
+    - `append(rec)` writes one line and flushes, so finished work survives crashes.
+    - `records` holds the latest state per URL (previous runs + this run), in
+      first-seen order; it becomes fetch_manifest.json at the end.
+    """
+
+    def __init__(self, path: Path, fresh: bool) -> None:
+        self.path = path
+        self.records: dict[str, dict] = {} if fresh else read_manifest_log(path)
+        seeded: list[dict] = []
+        if not fresh and not self.records:
+            old = path.with_name("fetch_manifest.json")  # runs from before the JSONL log existed
+            if old.exists():
+                seeded = [r for r in json.loads(old.read_text(encoding="utf-8")) if r.get("url")]
+                self.records = {r["url"]: r for r in seeded}
+        self.touched: dict[str, dict] = {}  # records written by this run only
+        self._file = open(path, "w" if fresh else "a", encoding="utf-8")
+        if seeded:
+            # Carry the legacy records into the log, or the next run would only see this run's URLs.
+            self._file.writelines(json.dumps(rec) + "\n" for rec in seeded)
+            self._file.flush()
+
+    def append(self, rec: dict) -> None:
+        """Persist one record now and remember it as the URL's latest state."""
+        self._file.write(json.dumps(rec) + "\n")
+        self._file.flush()
+        self.records[rec["url"]] = rec
+        self.touched[rec["url"]] = rec
+
+    def close(self) -> None:
+        """Close the log file."""
+        self._file.close()
+
+
+def select_urls(urls: list[str], previous: dict[str, dict], run_mode: str) -> list[str]:
+    """Pick which URLs this run fetches, based on their last recorded status."""
+    if run_mode == "resume":
+        return [u for u in urls if previous.get(u, {}).get("status") != "ok"]
+    if run_mode == "retry-failed":
+        return [u for u in urls if previous.get(u, {}).get("status") in RETRYABLE_STATUSES]
+    return urls
+
+
+def make_client(concurrency: int = MAX_HTTP_CONCURRENCY, http2: bool = False) -> httpx.AsyncClient:
+    """
+    Build the shared AsyncClient used for every URL in a run.
+    - httpx keeps a keep-alive pool per host (scheme+host+port), so repeat links
+      to the same vendor domain reuse the TCP/TLS connection.
+    - HTTP/2 is used only when requested and the optional `h2` package exists.
+    """
+    if http2 and importlib.util.find_spec("h2") is None:
+        print("Warning: --http2 needs the 'h2' package (pip install httpx[http2]). Using HTTP/1.1.")
+        http2 = False
+    limits = httpx.Limits(
+        max_connections=concurrency,  # total open sockets across all hosts
+        max_keepalive_connections=min(concurrency, MAX_KEEPALIVE_CONNECTIONS),  # idle sockets kept
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=limits,
+        timeout=TIMEOUT,
+        follow_redirects=True,
+        headers={"User-Agent": UA},
+    )
+
+
+def sniff_kind(ctype: str, disp: str, head: bytes) -> tuple[str, str | None]:
+    """
+    Decide "file" vs "html" from the GET response headers and first body bytes.
+    Returns (kind, extension hint). Order of evidence:
+    - Known document signatures (PDF, ZIP/DOCX, OLE2, ...) -> file, even if the
+      server labels it text/html or octet-stream. ZIP/OLE2 bodies take their
+      extension hint from container_extension.
+    - HTML markup at the start of the body -> html.
+    - Content-Disposition filename or a file-like Content-Type -> file.
+    - Anything else -> html.
+    """
+    for signature, ext in FILE_SIGNATURES:  # magic bytes are the strongest signal
+        if head.startswith(signature):
+            if signature in CONTAINER_HINTS:  # one signature, several document types
+                ext = container_extension(ctype, head, CONTAINER_HINTS[signature], ext)
+            return "file", ext
+    lead = head.lstrip(b"\xef\xbb\xbf \t\r\n")[:64].lower()  # drop BOM/whitespace before markup
+    if lead.startswith(HTML_MARKERS):
+        return "html", None
+    if "filename=" in disp:
+        return "file", None
+    if ctype.startswith(FILE_CTYPE_PREFIXES) and not ctype.startswith(HTML_CTYPES):
+        return "file", None
+    return "html", None
+
+
+def container_extension(
+    ctype: str, head: bytes, hints: tuple[tuple[bytes, str], ...], default: str | None
+) -> str | None:
+    """
+    Extension for a ZIP/OLE2 body, which may be any of several document types.
+    - A specific Content-Type decides (e.g. ...wordprocessingml.document -> .docx).
+    - Otherwise a member/stream name in the first bytes (word/ -> .docx, Workbook -> .xls).
+    - Otherwise `default` (.zip for ZIP, none for OLE2).
+    """
+    base = ctype.split(";")[0].strip()
+    if base not in GENERIC_CTYPES:
+        ext = mimetypes.guess_extension(base)
+        if ext:
+            return ext
+    for name, ext in hints:
+        if name in head:
+            return ext
+    return default
 
 
 def guess_name(url: str, disp: str, ctype: str) -> str:
@@ -94,87 +421,739 @@ def guess_name(url: str, disp: str, ctype: str) -> str:
     return f"download{ext or '.bin'}"  # fallback name
 
 
-def save_file(url: str, ctype: str, disp: str, files_dir: Path) -> str:
+class FileTooLargeError(Exception):
+    """Raised when a body is bigger than the per-file size cap."""
+
+
+def content_length(r: httpx.Response) -> int | None:
+    """Declared body size, or None if missing/garbled (or compressed on the wire)."""
+    value = r.headers.get("Content-Length", "")
+    if not value.isdigit() or r.headers.get("Content-Encoding", "identity") != "identity":
+        return None
+    return int(value)
+
+
+def range_validator(r: httpx.Response) -> str | None:
+    """Strong ETag or Last-Modified, used as If-Range so segments never mix two versions."""
+    etag = r.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return r.headers.get("Last-Modified")
+
+
+async def write_stream(writer: BlobWriter, head: bytes, body: AsyncIterator[bytes], limit: int = 0) -> None:
     """
-    Stream-download a file to files_dir and return the saved path.
-    Uses content type/disp to name the file where possible.
+    Write the already-read head bytes, then the rest of the streamed body, to a store writer.
+    Stops with FileTooLargeError once more than `limit` bytes arrive (0 = no cap).
     """
-    name = guess_name(url, disp, ctype or "")  # pick a filename
-    target = files_dir / name  # full path to save
-    with requests.get(url, stream=True, allow_redirects=True, timeout=TIMEOUT, headers={"User-Agent": UA}) as r:
-        r.raise_for_status()  # error on bad status
-        with open(target, "wb") as f:
-            for chunk in r.iter_content(chunk_size=8192):  # stream in chunks
-                if chunk:
-                    f.write(chunk)  # write chunk to disk
-    return str(target)  # return saved path
+    writer.write(head)  # bytes consumed while sniffing
+    async for chunk in body:  # rest of the body
+        if chunk:
+            writer.write(chunk)  # write chunk to disk
+            if limit and writer.size > limit:
+                raise FileTooLargeError(f"body exceeds {limit} bytes")
+
+
+async def store_body(
+    store: BlobStore,
+    url: str,
+    r: httpx.Response,
+    head: bytes,
+    body: AsyncIterator[bytes],
+    target_dir: Path,
+    name: str,
+    kind: str,
+    limit: int = 0,
+) -> str:
+    """Stream a body into the store, link it as target_dir/name, index it, and return the path."""
+    writer = store.writer()
+    try:
+        await write_stream(writer, head, body, limit)
+    except BaseException:
+        writer.discard()  # no half-written blobs
+        raise
+    sha256 = store.commit(writer)  # dedups identical bytes
+    target = store.link(sha256, target_dir, name, url)  # readable name in the vendor folder
+    store.remember(url, sha256, r.headers, kind, target.name, writer.size)
+    return str(target)
+
+
+async def download_ranges(
+    client: httpx.AsyncClient,
+    scheduler: HostScheduler,
+    url: str,
+    size: int,
+    validator: str | None,
+    part_path: Path,
+    connections: int,
+) -> None:
+    """
+    Download `size` bytes of url into part_path with parallel range requests.
+    - Segments of RANGE_SEGMENT_SIZE, at most `connections` in flight.
+    - The caller already holds a slot for url's host: one worker reuses it; the
+      others take their own `scheduler.slot(host)` per segment, so segments
+      count against the host's limit, rate and Retry-After like any request.
+      Helpers still queued for a slot when the last segment is taken are dropped.
+    - Finished segments are recorded in a `.json` next to the `.part`, so a
+      later run with the same size/validator only fetches what is missing.
+    - A segment that drops is retried from its start, up to SEGMENT_ATTEMPTS;
+      connect errors feed the host's circuit breaker.
+    - When a segment fails for good, the other segments are cancelled.
+    """
+    host = scheduler.host_for(url)
+    state_path = part_path.with_suffix(".json")
+    done: set[int] = set()
+    if part_path.exists() and state_path.exists():
+        state = json.loads(state_path.read_text(encoding="utf-8"))
+        if state.get("size") == size and state.get("validator") == validator:
+            done = set(state.get("done", []))  # resume: keep finished segments
+    if not done:
+        with open(part_path, "wb") as f:
+            f.truncate(size)  # preallocate so segments can write at their offsets
 
+    def save_state() -> None:
+        state_path.write_text(json.dumps({"size": size, "validator": validator, "done": sorted(done)}))
 
-def save_html_raw(url: str, pages_dir: Path) -> str:
-    """Download raw HTML via requests and return the saved path."""
-    r = requests.get(url, allow_redirects=True, timeout=TIMEOUT, headers={"User-Agent": UA})  # GET the page
-    r.raise_for_status()  # error on bad status
+    async def fetch_segment(index: int, start: int, end: int) -> None:
+        """Fetch bytes start..end (inclusive) and write them in place."""
+        headers = {"Range": f"bytes={start}-{end}"}
+        if validator:
+            headers["If-Range"] = validator  # server sends 200 (whole file) if it changed
+        for attempt in range(SEGMENT_ATTEMPTS):
+            try:
+                async with client.stream("GET", url, headers=headers) as r:
+                    if r.status_code != 206:
+                        raise RuntimeError(f"range {start}-{end} not honoured (HTTP {r.status_code})")
+                    pos = start
+                    with open(part_path, "r+b", buffering=LARGE_CHUNK_SIZE) as f:
+                        f.seek(start)
+                        async for chunk in r.aiter_bytes(chunk_size=LARGE_CHUNK_SIZE):
+                            f.write(chunk)
+                            pos += len(chunk)
+                    if pos != end + 1:
+                        raise httpx.ReadError(f"short range {start}-{end}: got {pos - start} bytes")
+                host.succeeded()
+                done.add(index)
+                save_state()  # checkpoint for resumption
+                return
+            except httpx.TransportError as e:
+                if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+                    host.connect_failed()  # feeds the circuit breaker
+                if attempt == SEGMENT_ATTEMPTS - 1:
+                    raise
+
+    segments = [
+        (i, start, min(start + RANGE_SEGMENT_SIZE, size) - 1)
+        for i, start in enumerate(range(0, size, RANGE_SEGMENT_SIZE))
+        if i not in done
+    ]
+    queued: set[asyncio.Task] = set()  # helpers waiting for a host slot
+
+    def take() -> tuple[int, int, int]:
+        """Next segment; once none are left, drop the helpers still waiting for a slot."""
+        segment = segments.pop(0)
+        if not segments:
+            for task in queued:
+                task.cancel()
+        return segment
+
+    async def worker(inherited: bool) -> None:
+        """Fetch segments until none are left, in the caller's slot or one of its own per segment."""
+        while segments:
+            if inherited:
+                await host.wait_turn()  # one rate token per request
+                await fetch_segment(*take())
+                continue
+            task = asyncio.current_task()
+            queued.add(task)
+            try:
+                async with scheduler.slot(host):
+                    queued.discard(task)
+                    if not segments:
+                        return
+                    await fetch_segment(*take())
+            finally:
+                queued.discard(task)
+
+    workers = [asyncio.create_task(worker(i == 0)) for i in range(max(1, min(connections, len(segments))))]
+    try:
+        await asyncio.wait(workers, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        for task in workers:
+            task.cancel()  # a segment failed (or we were cancelled): stop writing to the .part
+        await asyncio.gather(*workers, return_exceptions=True)
+    for task in workers:
+        if not task.cancelled() and task.exception():
+            raise task.exception()
+    state_path.unlink(missing_ok=True)  # complete
+
+
+async def save_file(
+    url: str,
+    r: httpx.Response,
+    head: bytes,
+    body: AsyncIterator[bytes],
+    files_dir: Path,
+    ext: str | None,
+    store: BlobStore,
+    client: httpx.AsyncClient,
+    scheduler: HostScheduler,
+    config: FetchConfig,
+) -> str:
+    """
+    Save an open GET response into files_dir (via the store) and return the saved path.
+    Uses content type/disp to name the file; adds the sniffed extension if the
+    name has none or a page-like one (e.g. a PDF served from /download or view.aspx).
+    - Bigger than the size cap: FileTooLargeError before reading the body.
+    - Large and range-capable: parallel range download into a resumable .part.
+    - Otherwise: stream this response into the store.
+    """
+    ctype = r.headers.get("Content-Type", "").lower()
+    disp = r.headers.get("Content-Disposition", "")
+    name = guess_name(url, disp, ctype)  # pick a filename
+    if ext and Path(name).suffix.lower() in WEB_SUFFIXES:
+        name += ext  # add extension from magic bytes
+    size = content_length(r)
+    if size and config.max_file_size and size > config.max_file_size:
+        raise FileTooLargeError(f"{size} bytes > cap of {config.max_file_size}")
+    ranged = "bytes" in r.headers.get("Accept-Ranges", "").lower()
+    if size and size >= LARGE_FILE_THRESHOLD and ranged and config.range_connections > 1:
+        part_path = store.part_path(url)
+        await download_ranges(client, scheduler, url, size, range_validator(r), part_path, config.range_connections)
+        sha256, size = await asyncio.to_thread(store.commit_file, part_path)  # hash off the event loop
+        target = store.link(sha256, files_dir, name, url)
+        store.remember(url, sha256, r.headers, "file", target.name, size)
+        return str(target)
+    return await store_body(store, url, r, head, body, files_dir, name, "file", config.max_file_size)
+
+
+async def save_html_raw(
+    url: str,
+    r: httpx.Response,
+    head: bytes,
+    body: AsyncIterator[bytes],
+    pages_dir: Path,
+    store: BlobStore,
+    config: FetchConfig,
+) -> str:
+    """Stream an open GET response (raw HTML bytes, as served) into pages_dir and return the saved path."""
     name = guess_name(url, "", "text/html")  # pick a filename
     if not name.lower().endswith(".html"):
         name += ".html"  # ensure .html extension
-    target = pages_dir / name  # path to save
-    target.write_text(r.text, encoding=r.encoding or "utf-8", errors="ignore")  # write HTML text
-    return str(target)  # return saved path
+    return await store_body(store, url, r, head, body, pages_dir, name, "html_raw", config.max_file_size)
 
 
 def check_connectivity() -> bool:
     """Quick check: can we reach the internet? Returns True/False."""
     try:
-        requests.get("https://www.google.com", timeout=3)  # tiny probe
+        httpx.get("https://www.google.com", timeout=3)  # tiny probe
         return True
     except Exception:
         return False
 
 
-def save_html_rendered(url: str, pages_dir: Path) -> str | None:
+def should_block(resource_type: str, url: str, main_document: bool = False) -> bool:
+    """
+    Lean render mode: True for images/media/fonts and known tracker requests.
+    - The page's own top-level document is never blocked, even on a tracker host or
+      with a marker in its path (segment.com/docs/, .../analytics.js guides); the
+      tracker rules only apply to subresources.
+    """
+    if main_document:
+        return False
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = (urlsplit(url).hostname or "").lower()
+    if any(host == t or host.endswith("." + t) for t in TRACKER_HOSTS):
+        return True
+    path = url.split("?", 1)[0].lower()
+    return any(marker in path for marker in TRACKER_PATH_MARKERS)
+
+
+async def route_lean(route: Route) -> None:
+    """Playwright route handler: abort what should_block flags, let the rest through."""
+    request = route.request
+    main_document = request.resource_type == "document" and request.frame.parent_frame is None
+    if should_block(request.resource_type, request.url, main_document):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def save_html_rendered(
+    browser: Browser, url: str, pages_dir: Path, store: BlobStore, mode: str = "lean"
+) -> str:
     """
-    Render the page via Playwright (if available) and return the saved path.
+    Render the page in a fresh context of an already-running browser and return the saved path.
+    - lean: block heavy/tracking requests, wait for DOM-ready, then give the
+      network at most RENDER_IDLE_BUDGET_MS to settle (trackers often never do).
+    - full: load everything and wait for `networkidle`.
     Scrolls to bottom and waits briefly to trigger lazy-load content.
+    The HTML goes through the store like downloaded bodies: never written into a
+    path that may be a hard link to another URL's blob.
     """
-    if not PLAYWRIGHT_AVAILABLE:
-        return None
-    with sync_playwright() as p:  # start Playwright
-        browser = p.chromium.launch(headless=True)  # launch headless Chromium
-        page = browser.new_page()  # open a new tab
-        page.goto(url, wait_until="networkidle", timeout=TIMEOUT * 1000)  # navigate and wait
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")  # scroll to bottom
-        page.wait_for_timeout(2000)  # short wait for lazy content
-        html = page.content()  # grab rendered HTML
-        name = guess_name(url, "", "text/html")  # filename
-        if not name.lower().endswith(".html"):
-            name += ".rendered.html"  # mark as rendered
-        target = pages_dir / name  # path to save
-        target.write_text(html, encoding="utf-8", errors="ignore")  # write HTML
-        browser.close()  # close browser
-        return str(target)  # return saved path
-
-
-def process_url_http(url: str, files_dir: Path, pages_dir: Path, pending_render: list) -> dict:
-    """
-    HTTP phase for a single URL:
-    - HEAD to classify file vs html.
-    - GET and save as file or raw html.
+    context = await browser.new_context(user_agent=UA)  # isolated cookies/cache per URL
+    try:
+        if mode == "lean":
+            await context.route("**/*", route_lean)  # drop images/fonts/trackers
+        page = await context.new_page()  # open a new tab
+        wait_until = "domcontentloaded" if mode == "lean" else "networkidle"
+        await page.goto(url, wait_until=wait_until, timeout=TIMEOUT * 1000)  # navigate and wait
+        if mode == "lean":
+            try:
+                await page.wait_for_load_state("networkidle", timeout=RENDER_IDLE_BUDGET_MS)  # bounded idle
+            except PlaywrightTimeoutError:
+                pass  # DOM is ready; stop waiting on chatty trackers
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")  # scroll to bottom
+        await page.wait_for_timeout(RENDER_SETTLE_MS[mode])  # short wait for lazy content
+        html = await page.content()  # grab rendered HTML
+    finally:
+        await context.close()  # frees the tab; the browser stays up
+    name = guess_name(url, "", "text/html")  # filename
+    if not name.lower().endswith(".html"):
+        name += ".rendered.html"  # mark as rendered
+    writer = store.writer()
+    writer.write(html.encode("utf-8", errors="ignore"))
+    sha256 = store.commit(writer)  # dedups identical pages
+    target = store.link(sha256, pages_dir, name, url)  # collision-safe readable name
+    store.remember(url, sha256, {}, "html_rendered", target.name, writer.size)  # no validators
+    return str(target)  # return saved path
+
+
+async def close_quietly(browser: Browser) -> None:
+    """Close a browser, ignoring errors from one that already crashed."""
+    try:
+        await browser.close()
+    except Exception:
+        pass
+
+
+class BrowserSlot:
+    """
+    One Chromium process shared by several page workers.
+    - Launched lazily on first use.
+    - Relaunched after `recycle_after` pages, or when it has crashed/disconnected.
+    - A retired browser is closed once its in-flight pages finish.
+    """
+
+    def __init__(self, playwright: Playwright, recycle_after: int = RECYCLE_AFTER_PAGES) -> None:
+        self.playwright = playwright
+        self.recycle_after = recycle_after
+        self.launches = 0  # how many times Chromium was started for this slot
+        self._browser: Browser | None = None  # current browser
+        self._served = 0  # pages handed out by the current browser
+        self._active: dict[Browser, int] = {}  # in-flight pages per browser
+        self._lock = asyncio.Lock()  # one launch at a time
+
+    async def acquire(self) -> Browser:
+        """Return a live browser for one page, launching/recycling if needed."""
+        async with self._lock:
+            browser = self._browser
+            if browser is None or not browser.is_connected() or self._served >= self.recycle_after:
+                if browser is not None and self._active.get(browser, 0) == 0:
+                    self._active.pop(browser, None)
+                    await close_quietly(browser)  # idle: close now, else on last release
+                browser = await self.playwright.chromium.launch(headless=True)  # launch headless Chromium
+                self._browser = browser
+                self._served = 0
+                self.launches += 1
+            self._served += 1
+            self._active[browser] = self._active.get(browser, 0) + 1
+            return browser
+
+    async def release(self, browser: Browser) -> None:
+        """Mark one page as done; close the browser if it was retired and is now idle."""
+        self._active[browser] -= 1
+        if browser is not self._browser and self._active[browser] == 0:
+            del self._active[browser]
+            await close_quietly(browser)
+
+    async def close(self) -> None:
+        """Close every browser this slot still owns."""
+        for browser in list(self._active) + ([self._browser] if self._browser else []):
+            await close_quietly(browser)
+        self._active.clear()
+        self._browser = None
+
+
+class RenderService:
+    """
+    Long-lived Playwright render pool backed by a work queue.
+    - `browsers` Chromium processes, each rendering up to `pages_per_browser`
+      URLs at once in isolated contexts.
+    - `render(url, pages_dir)` queues a job and waits for its saved path.
+    - A page that fails because its browser crashed is retried once on a fresh browser.
+    """
+
+    def __init__(
+        self,
+        store: BlobStore,
+        browsers: int = RENDER_BROWSERS,
+        pages_per_browser: int = PAGES_PER_BROWSER,
+        recycle_after: int = RECYCLE_AFTER_PAGES,
+        mode: str = "lean",
+    ) -> None:
+        self.browsers = max(1, browsers)
+        self.pages_per_browser = max(1, pages_per_browser)
+        self.recycle_after = max(1, recycle_after)
+        self.mode = mode  # "lean" or "full", see save_html_rendered
+        self.store = store  # rendered HTML is stored and linked like downloaded bodies
+        self._queue: asyncio.Queue = asyncio.Queue()  # (url, pages_dir, future) jobs
+        self._playwright: Playwright | None = None
+        self._slots: list[BrowserSlot] = []
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def launches(self) -> int:
+        """Total Chromium launches so far (across all slots)."""
+        return sum(slot.launches for slot in self._slots)
+
+    async def __aenter__(self) -> RenderService:
+        self._playwright = await async_playwright().start()  # one Playwright driver for the run
+        self._slots = [BrowserSlot(self._playwright, self.recycle_after) for _ in range(self.browsers)]
+        self._workers = [
+            asyncio.create_task(self._worker(self._slots[i % self.browsers]))
+            for i in range(self.browsers * self.pages_per_browser)
+        ]
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        for _ in self._workers:
+            self._queue.put_nowait(None)  # one stop signal per worker
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for slot in self._slots:
+            await slot.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    async def render(self, url: str, pages_dir: Path) -> str:
+        """Queue one URL for rendering and wait for the saved path."""
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((url, pages_dir, fut))
+        return await fut
+
+    async def _worker(self, slot: BrowserSlot) -> None:
+        """Pull jobs off the queue until a stop signal arrives."""
+        while True:
+            job = await self._queue.get()
+            if job is None:
+                return
+            url, pages_dir, fut = job
+            try:
+                saved = await self._render_once(slot, url, pages_dir)
+            except Exception as e:
+                if not fut.done():
+                    fut.set_exception(e)
+            else:
+                if not fut.done():
+                    fut.set_result(saved)
+
+    async def _render_once(self, slot: BrowserSlot, url: str, pages_dir: Path) -> str:
+        """Render on the slot's browser; retry once if the browser itself died."""
+        browser = await slot.acquire()
+        try:
+            return await save_html_rendered(browser, url, pages_dir, self.store, self.mode)
+        except Exception:
+            if browser.is_connected():
+                raise  # a page/navigation error, not a crash
+        finally:
+            await slot.release(browser)
+        browser = await slot.acquire()  # crashed mid-render: relaunch and try once more
+        try:
+            return await save_html_rendered(browser, url, pages_dir, self.store, self.mode)
+        finally:
+            await slot.release(browser)
+
+
+class CircuitOpenError(Exception):
+    """Raised for a URL whose host tripped the circuit breaker earlier in the run."""
+
+
+def retry_after_seconds(value: str | None, attempt: int) -> float | None:
+    """
+    Seconds to wait before retrying a throttled request.
+    - Retry-After may be delta-seconds or an HTTP date.
+    - Without one, back off exponentially from DEFAULT_BACKOFF.
+    - Returns None when the server asks for longer than MAX_RETRY_AFTER.
+    """
+    delay = DEFAULT_BACKOFF * (2**attempt)  # fallback backoff
+    if value:
+        value = value.strip()
+        if value.isdigit():
+            delay = float(value)
+        else:
+            try:
+                delay = parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                pass  # unparseable: keep the fallback
+    delay = max(0.0, delay)
+    return delay if delay <= MAX_RETRY_AFTER else None
+
+
+class HostState:
+    """
+    Politeness state for one host.
+    - Adaptive concurrency: `limit` starts at the cap, halves on throttling and
+      grows by one after `limit` clean successes (AIMD).
+    - Token bucket: at most `rate` requests/second after a burst of `burst`.
+    - Retry-After embargo: no new request before `not_before`.
+    - Circuit breaker: opens after `breaker_threshold` consecutive connect errors.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, rate: float, burst: int, breaker_threshold: int) -> None:
+        self.name = name
+        self.max_limit = max(1, max_concurrency)
+        self.limit = self.max_limit  # current adaptive cap
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.breaker_threshold = breaker_threshold
+        self.in_flight = 0
+        self.tokens = float(self.burst)  # start with a full bucket
+        self.updated = time.monotonic()  # last refill time
+        self.not_before = 0.0  # monotonic time before which nothing is sent
+        self.connect_failures = 0  # consecutive connect errors
+        self.is_open = False  # circuit breaker tripped
+        self._clean = 0  # successes since the last limit change
+        self._cond = asyncio.Condition()
+
+    def check_open(self) -> None:
+        """Raise CircuitOpenError once the breaker has tripped."""
+        if self.is_open:
+            raise CircuitOpenError(f"{self.name}: {self.connect_failures} consecutive connect errors")
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Wait for a concurrency slot and a rate token, hold the slot for one request.
+        Raises CircuitOpenError instead of waiting on (or after waiting for) a dead host.
+        """
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.is_open or self.in_flight < self.limit)
+            self.check_open()
+            self.in_flight += 1
+        try:
+            await self.wait_turn()
+            yield
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    async def wait_turn(self) -> None:
+        """Honour any Retry-After embargo, then take one token from the bucket."""
+        while True:
+            self.check_open()  # the breaker may trip while this request waits
+            now = time.monotonic()
+            if now < self.not_before:
+                await asyncio.sleep(min(self.not_before - now, 1.0))  # re-check the breaker each second
+                continue
+            if self.rate <= 0:
+                return  # rate limiting disabled
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)  # refill
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)  # until the next token
+
+    def throttled(self, delay: float) -> None:
+        """Server said slow down: halve the limit and pause the host for `delay` seconds."""
+        self.limit = max(1, self.limit // 2)
+        self._clean = 0
+        self.not_before = max(self.not_before, time.monotonic() + delay)
+
+    def succeeded(self) -> None:
+        """Clean response: reset the breaker count and slowly raise the limit again."""
+        self.connect_failures = 0
+        self._clean += 1
+        if self.limit < self.max_limit and self._clean >= self.limit:
+            self.limit += 1  # waiters re-check on the next slot release
+            self._clean = 0
+
+    def connect_failed(self) -> None:
+        """Connection refused/timed out: count it and trip the breaker at the threshold."""
+        self.connect_failures += 1
+        if self.connect_failures >= self.breaker_threshold:
+            self.is_open = True
+
+
+class HostScheduler:
+    """
+    Shared request scheduler: one global concurrency cap plus a HostState per host.
+    Every request runs inside `slot(host)`, which takes the host's slot and
+    token first and only then a global slot, so a crowded host never holds
+    global capacity while it waits.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = MAX_HTTP_CONCURRENCY,
+        per_host: int = PER_HOST_CONCURRENCY,
+        rate: float = PER_HOST_RATE,
+        burst: int = PER_HOST_BURST,
+        breaker_threshold: int = BREAKER_THRESHOLD,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        self.per_host = per_host
+        self.rate = rate
+        self.burst = burst
+        self.breaker_threshold = breaker_threshold
+        self.max_retries = max_retries
+        self.hosts: dict[str, HostState] = {}
+        self._global = asyncio.Semaphore(concurrency)
+
+    def host_for(self, url: str) -> HostState:
+        """Return (creating on first use) the HostState for the URL's hostname."""
+        name = (urlsplit(url).hostname or "").lower()
+        state = self.hosts.get(name)
+        if state is None:
+            state = HostState(name, self.per_host, self.rate, self.burst, self.breaker_threshold)
+            self.hosts[name] = state
+        return state
+
+    @asynccontextmanager
+    async def slot(self, host: HostState):
+        """Hold a host slot (with rate token) and a global slot for one request."""
+        async with host.slot():
+            async with self._global:
+                host.check_open()  # tripped while this request waited for global capacity
+                yield
+
+
+async def save_response(
+    url: str,
+    r: httpx.Response,
+    files_dir: Path,
+    pages_dir: Path,
+    store: BlobStore,
+    client: httpx.AsyncClient,
+    scheduler: HostScheduler,
+    config: FetchConfig,
+) -> tuple[str, str]:
+    """
+    Classify an open streaming response from its headers + first bytes and
+    stream it to files/ or web pages/. Returns (saved path, record type).
+    """
+    body = r.aiter_bytes(chunk_size=CHUNK_SIZE)  # one iterator for sniffing and saving
+    head = b""
+    async for chunk in body:  # read just enough to sniff
+        head += chunk
+        if len(head) >= SNIFF_BYTES:
+            break
+    ctype = r.headers.get("Content-Type", "").lower()
+    disp = r.headers.get("Content-Disposition", "")
+    kind, ext = sniff_kind(ctype, disp, head)
+    if kind == "file":  # treat as file
+        return await save_file(url, r, head, body, files_dir, ext, store, client, scheduler, config), "file"
+    return await save_html_raw(url, r, head, body, pages_dir, store, config), "html_raw"  # treat as HTML
+
+
+class PhaseTimer:
+    """
+    Per-URL phase durations in seconds.
+    - `trace` is an httpx trace hook: it times connect/TLS/TTFB for every
+      request it is attached to (redirect hops add up).
+    - `add` records phases measured by hand (queue wait, transfer, render).
+    """
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+        self._started: dict[str, float] = {}  # trace step -> start time
+
+    async def trace(self, event_name: str, info: dict) -> None:
+        """httpcore calls this with e.g. "connection.start_tls.started" / ".complete" / ".failed"."""
+        step, _, stage = event_name.rpartition(".")
+        if step not in TRACE_PHASES:
+            return
+        if stage == "started":
+            self._started[step] = time.perf_counter()
+        elif step in self._started:
+            self.add(TRACE_PHASES[step], time.perf_counter() - self._started.pop(step))
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Accumulate time spent in a phase."""
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    def rounded(self) -> dict[str, float]:
+        """Timings rounded for the manifest."""
+        return {phase: round(seconds, 4) for phase, seconds in self.timings.items()}
+
+
+async def process_url_http(
+    client: httpx.AsyncClient,
+    scheduler: HostScheduler,
+    store: BlobStore,
+    config: FetchConfig,
+    url: str,
+    files_dir: Path,
+    pages_dir: Path,
+    pending_render: list,
+) -> dict:
+    """
+    HTTP phase for a single URL (one request, plus retries when throttled):
+    - Wait for the host's slot/rate token; fail fast if its breaker is open.
+    - Streaming GET, conditional if the store has validators for this URL;
+      on 429/503 honour Retry-After and retry.
+    - 304: re-link the stored blob. Otherwise classify file vs html from
+      headers + first bytes and stream into the store.
     - On failure, queue for Playwright render if available.
+    - Timings, bytes, redirects and final URL are filled in whatever happens.
     """
-    record = {"url": url, "status": "unknown", "saved": None, "type": None, "error": None}  # tracking info
+    record = {  # tracking info
+        "url": url,
+        "status": "unknown",
+        "saved": None,
+        "type": None,
+        "error": None,
+        "final_url": None,
+        "redirects": 0,
+        "bytes": 0,
+        "timings": {},
+    }
+    host = scheduler.host_for(url)
+    timer = PhaseTimer()
+    started = time.perf_counter()
     try:
-        ctype, disp = classify_via_headers(url)  # try HEAD for type
-        is_file = any(s in ctype for s in ["application/", "image/", "audio/", "video/"]) or "filename=" in disp
-        if is_file:  # treat as file
-            record["saved"] = save_file(url, ctype, disp, files_dir)
-            record["type"] = "file"
-            record["status"] = "ok"
-            return record
-        # else treat as HTML
-        record["saved"] = save_html_raw(url, pages_dir)
-        record["type"] = "html_raw"
+        for attempt in range(scheduler.max_retries + 1):
+            host.check_open()  # host already declared dead this run: no slot, no rate token
+            waited = time.perf_counter()
+            async with scheduler.slot(host):
+                timer.add("queue", time.perf_counter() - waited)  # host/global slot + rate token wait
+                try:
+                    async with client.stream(
+                        "GET", url, headers=store.conditional_headers(url), extensions={"trace": timer.trace}
+                    ) as r:
+                        record["final_url"] = str(r.url)
+                        record["redirects"] = len(r.history)
+                        if r.status_code == 304 and (entry := store.cached(url)):  # unchanged since last run
+                            target_dir = files_dir if entry["kind"] == "file" else pages_dir
+                            record["saved"] = str(store.link(entry["sha256"], target_dir, entry["name"], url))
+                            record["type"] = entry["kind"]
+                            store.unchanged += 1
+                        else:
+                            if r.status_code in RETRY_STATUSES and attempt < scheduler.max_retries:
+                                delay = retry_after_seconds(r.headers.get("Retry-After"), attempt)
+                                if delay is not None:
+                                    host.throttled(delay)  # slow the host down, then retry
+                                    continue
+                            r.raise_for_status()  # error on bad status
+                            body_started = time.perf_counter()
+                            record["saved"], record["type"] = await save_response(
+                                url, r, files_dir, pages_dir, store, client, scheduler, config
+                            )
+                            timer.add("transfer", time.perf_counter() - body_started)  # body to disk
+                            record["bytes"] = store.index[url]["size"]
+                except (httpx.ConnectError, httpx.ConnectTimeout):
+                    host.connect_failed()  # feeds the circuit breaker
+                    raise
+            host.succeeded()
+            break
         record["status"] = "ok"
         return record
+    except (CircuitOpenError, FileTooLargeError) as e:
+        record["error"] = repr(e)  # a render would hit the same dead host / same huge body
+        record["status"] = "failed"
+        return record
     except Exception as e:
         record["error"] = repr(e)  # note error
         if PLAYWRIGHT_AVAILABLE:
@@ -183,104 +1162,423 @@ def process_url_http(url: str, files_dir: Path, pages_dir: Path, pending_render:
         else:
             record["status"] = "failed"  # no render available
         return record  # return failure/pending
+    finally:
+        timer.add("total", time.perf_counter() - started)
+        record["timings"] = timer.rounded()
+
+
+@dataclass
+class VendorJob:
+    """One vendor folder in a run: where its outputs go and which URLs it still needs."""
+
+    base_dir: Path  # vendor folder (holds deduplicated.json)
+    files_dir: Path  # ./files
+    pages_dir: Path  # ./web pages
+    log: ManifestLog  # fetch_manifest.jsonl for this vendor
+    urls: list[str]  # URLs this run fetches (after --resume/--retry-failed)
+    total: int  # URLs listed in deduplicated.json
+    pending_render: list[dict] = field(default_factory=list)  # queue for Playwright
+    bare_forms: dict[str, str] = field(default_factory=dict)  # URL -> bare form, from the URL index
+    earlier: dict[str, tuple[str, str]] = field(default_factory=dict)  # bare form -> (URL, blob) fetched before
+
+    @property
+    def vendor(self) -> str:
+        """Vendor folder name, as the dedup scripts key the URL index (real name even for `--base-dir .`)."""
+        return self.base_dir.resolve().name
+
+
+def load_urls(dedup_file: Path) -> list[str]:
+    """Read deduplicated.json and return the cleaned URL of every entry."""
+    data = json.loads(dedup_file.read_text(encoding="utf-8"))  # load JSON
+    urls = []  # list of URLs to fetch
+    for key, entry in data.items():  # loop entries
+        if key == "_meta":  # skip meta
+            continue
+        raw = entry.get("original form") or entry.get("bare minimum form") or ""  # pick URL
+        if raw:
+            urls.append(clean_url(raw))  # clean and store
+    return urls
+
+
+def load_urls_parquet(parquet_file: Path) -> list[str]:
+    """Same URLs as load_urls, reading only the `original` column of selected rows."""
+    table = load_links(parquet_file, columns=["original"], selected_only=True)
+    return [clean_url(raw) for raw in table.column("original").to_pylist() if raw]
+
+
+def prepare_vendor(base_dir: Path, config: FetchConfig) -> VendorJob:
+    """Create output folders, open the progress log and pick the URLs to fetch for one vendor."""
+    dedup_file = base_dir / "deduplicated.json"  # path to dedup file
+    if not dedup_file.exists():
+        raise FileNotFoundError(f"deduplicated.json not found at {dedup_file}")
+    parquet_file = base_dir / PARQUET_NAME  # columnar copy, if the dedup run wrote one
+    if PYARROW_AVAILABLE and parquet_file.exists() and parquet_file.stat().st_mtime >= dedup_file.stat().st_mtime:
+        urls = load_urls_parquet(parquet_file)
+    else:
+        urls = load_urls(dedup_file)
+    files_dir = base_dir / "files"  # output dir for files
+    pages_dir = base_dir / "web pages"  # output dir for pages
+    files_dir.mkdir(exist_ok=True)  # create if missing
+    pages_dir.mkdir(exist_ok=True)
+    log = ManifestLog(base_dir / MANIFEST_LOG_NAME, fresh=config.run_mode == "fresh")  # progress log
+    todo = select_urls(urls, log.records, config.run_mode)  # URLs this run actually fetches
+    if config.run_mode != "fresh":
+        print(f"{base_dir.resolve().name}: {config.run_mode}: {len(todo)} of {len(urls)} URLs queued")
+    return VendorJob(base_dir, files_dir, pages_dir, log, todo, len(urls))
+
+
+def finish_vendor(job: VendorJob) -> Path:
+    """Close the vendor's progress log; write fetch_manifest.json and this run's fetch_stats.json."""
+    job.log.close()
+    manifest_path = job.base_dir / "fetch_manifest.json"  # manifest path
+    manifest = list(job.log.records.values())  # latest state of every URL, across runs
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")  # save manifest
+    if job.log.touched:
+        stats = build_stats(list(job.log.touched.values()))  # only what this run fetched
+        (job.base_dir / STATS_NAME).write_text(json.dumps(stats, indent=2), encoding="utf-8")
+    return manifest_path
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil(n * pct / 100)
+    return sorted_values[int(rank) - 1]
 
 
-def main(base_dir: Path) -> None:
+def phase_summary(records: list[dict]) -> dict[str, dict]:
+    """count/p50/p95/p99/max per phase over the records that have that phase."""
+    values: dict[str, list[float]] = defaultdict(list)
+    for rec in records:
+        timings = rec.get("timings") or {}
+        for phase in STAT_PHASES:
+            if phase in timings:
+                values[phase].append(timings[phase])
+    summary = {}
+    for phase in STAT_PHASES:
+        if values[phase]:
+            ordered = sorted(values[phase])
+            summary[phase] = {
+                "count": len(ordered),
+                "p50": percentile(ordered, 50),
+                "p95": percentile(ordered, 95),
+                "p99": percentile(ordered, 99),
+                "max": ordered[-1],
+            }
+    return summary
+
+
+def build_stats(records: list[dict]) -> dict:
+    """Run-level latency report: per phase, per host, and the slowest URLs."""
+    by_host: dict[str, list[dict]] = defaultdict(list)
+    for rec in records:
+        by_host[(urlsplit(rec["url"]).hostname or "").lower()].append(rec)
+
+    def elapsed(rec: dict) -> float:
+        timings = rec.get("timings") or {}
+        return timings.get("total", 0.0) + timings.get("render", 0.0)
+
+    statuses: dict[str, int] = defaultdict(int)
+    for rec in records:
+        statuses[rec.get("status") or "unknown"] += 1
+    return {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "urls": len(records),
+        "status_counts": dict(statuses),
+        "bytes": sum(rec.get("bytes") or 0 for rec in records),
+        "redirects": sum(rec.get("redirects") or 0 for rec in records),
+        "phases": phase_summary(records),
+        "hosts": {
+            host: {
+                "urls": len(recs),
+                "bytes": sum(rec.get("bytes") or 0 for rec in recs),
+                "phases": phase_summary(recs),
+            }
+            for host, recs in sorted(by_host.items(), key=lambda item: -len(item[1]))
+        },
+        "slowest": [
+            {
+                "url": rec["url"],
+                "status": rec.get("status"),
+                "seconds": round(elapsed(rec), 4),
+                "timings": rec.get("timings") or {},
+            }
+            for rec in sorted(records, key=elapsed, reverse=True)[:SLOWEST_URLS]
+        ],
+    }
+
+
+def print_stats(stats: dict) -> None:
+    """Short console version of a latency report."""
+    print(f"\nLatency over {stats['urls']} URLs ({stats['bytes'] / 2**20:0.1f} MiB):")
+    print(f"  {'phase':10} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for phase, row in stats["phases"].items():
+        print(f"  {phase:10} {row['p50']:8.3f} {row['p95']:8.3f} {row['p99']:8.3f} {row['max']:8.3f}")
+    for row in stats["slowest"][:5]:
+        print(f"  slow: {row['seconds']:8.3f}s {row['url']}")
+
+
+def share_result(store: BlobStore, rec: dict, job: VendorJob, url: str) -> dict:
     """
-    Orchestrate the full fetch:
-    - Load deduplicated.json.
-    - Parallel HTTP fetches (files/raw HTML).
-    - Parallel Playwright renders for pending URLs.
-    - Write manifest.
+    Record for `url` in `job`, reusing a fetch of the same bare URL made for another vendor.
+    - A stored body is hard-linked into this vendor's folder (no second download).
+    - A URL still waiting for a browser is queued for this vendor's own render.
+    - Failures are copied as they are.
     """
-    try:
-        # Check basic internet connectivity before doing heavy work.
-        if not check_connectivity():
-            print("Warning: Internet connectivity check failed (google.com unreachable). Continuing anyway...")
+    shared = {**rec, "url": url, "shared_from": rec["url"], "bytes": 0, "timings": {}}
+    entry = store.cached(rec["url"])
+    if rec["status"] == "ok" and entry:
+        target_dir = job.files_dir if entry["kind"] == "file" else job.pages_dir
+        shared["saved"] = str(store.link(entry["sha256"], target_dir, entry["name"], url))
+        store.index.setdefault(url, dict(entry))  # validators for when this URL is fetched on its own
+    elif rec["status"] == "pending_render":
+        job.pending_render.append(shared)
+    return shared
 
-        dedup_file = base_dir / "deduplicated.json"  # path to dedup file
-        if not dedup_file.exists():
-            raise SystemExit(f"deduplicated.json not found at {dedup_file}")  # fail if missing
 
-        files_dir = base_dir / "files"  # output dir for files
-        pages_dir = base_dir / "web pages"  # output dir for pages
-        files_dir.mkdir(exist_ok=True)  # create if missing
-        pages_dir.mkdir(exist_ok=True)
+def reuse_earlier(store: BlobStore, earlier: tuple[str, str] | None, members: list[tuple[VendorJob, str]]) -> list:
+    """
+    Records for a group of same-bare URLs from an earlier run's fetch (cross-vendor index), or [] to fetch.
+    - Only for URLs new to the store: a URL with its own entry is re-checked with a conditional GET.
+    - Only while that fetch's blob is still in the store.
+    """
+    if earlier is None or any(store.cached(url) for _, url in members):
+        return []
+    url, sha256 = earlier
+    entry = store.cached(url)
+    if not entry or entry["sha256"] != sha256:
+        return []
+    rec = {"url": url, "status": "ok", "type": entry["kind"], "error": None}
+    return [(job, share_result(store, rec, job, member)) for job, member in members]
 
-        data = json.loads(dedup_file.read_text(encoding="utf-8"))  # load JSON
-        urls = []  # list of URLs to fetch
-        for key, entry in data.items():  # loop entries
-            if key == "_meta":  # skip meta
-                continue
-            raw = entry.get("original form") or entry.get("bare minimum form") or ""  # pick URL
-            if raw:
-                urls.append(clean_url(raw))  # clean and store
 
-        manifest: list[dict] = []  # results list
-        pending_render: list[dict] = []  # queue for Playwright
+async def run_http_phase(jobs: list[VendorJob], config: FetchConfig, store: BlobStore) -> None:
+    """
+    Fetch every URL of every vendor job on one event loop.
+    - One shared client, so connections are pooled and reused per host.
+    - One HostScheduler caps in-flight requests globally and per host, across
+      vendors, so one vendor's slow tail overlaps with the others' work.
+    - URLs with the same bare form (per the cross-vendor URL index) are fetched
+      once; the other vendors get the stored result linked into their folders.
+      A bare form an earlier run already fetched is linked without a request.
+    - Each record lands in its vendor's progress log as it finishes.
+    - Bodies go through the store; its URL index is saved even if the run dies.
+    """
+    scheduler = HostScheduler(
+        config.concurrency,
+        config.per_host,
+        config.host_rate,
+        config.host_burst,
+        config.breaker_threshold,
+        config.max_retries,
+    )
 
-        start = time.time()  # start timer
+    async with make_client(config.concurrency, config.http2) as client:
 
-        # Phase 1: HTTP in parallel
-    with ThreadPoolExecutor(max_workers=MAX_HTTP_WORKERS) as pool:  # HTTP pool
-        futures = {pool.submit(process_url_http, u, files_dir, pages_dir, pending_render): u for u in urls}  # submit all
-        for fut in as_completed(futures):  # as each finishes
+        async def fetch_one(job: VendorJob, url: str) -> tuple[VendorJob, dict]:
+            """Fetch one URL into its vendor's folders."""
             try:
-                rec = fut.result()  # get record
+                rec = await process_url_http(
+                    client, scheduler, store, config, url, job.files_dir, job.pages_dir, job.pending_render
+                )
             except Exception as e:
                 rec = {
-                    "url": "<unknown>",
+                    "url": url,
                     "status": "failed",
                     "type": None,
                     "saved": None,
                     "error": f"HTTP worker error: {repr(e)}",
                 }
-            manifest.append(rec)  # store
-            print(f"{rec['status']:12} {rec.get('type') or '-':12} {rec.get('url')} -> {rec.get('saved')}")  # log
+            return job, rec
 
-        # Phase 2: Render pending URLs (concurrent)
-        if PLAYWRIGHT_AVAILABLE and pending_render:
-            print(f"\nRendering {len(pending_render)} URLs via Playwright (up to {MAX_RENDER_WORKERS} at a time)...")
+        async def fetch_group(bare: str, members: list[tuple[VendorJob, str]]) -> list[tuple[VendorJob, dict]]:
+            """Fetch the first member's URL and share the result with the rest of the group."""
+            reused = reuse_earlier(store, members[0][0].earlier.get(bare), members)
+            if reused:
+                reused_bares.add(bare)
+                return reused
+            job, rec = await fetch_one(*members[0])
+            return [(job, rec)] + [(other, share_result(store, rec, other, url)) for other, url in members[1:]]
 
-            def render_one(rec: dict) -> dict:
-                """Helper to render one pending URL."""
-                try:
-                    saved = save_html_rendered(rec["url"], pages_dir)  # try render
-                    rec["saved"] = saved
-                    rec["type"] = "html_rendered"
-                    rec["status"] = "ok"
-                    rec["error"] = None
-                except Exception as e:
-                    rec["status"] = "failed"
-                    rec["error"] = repr(e)
-                return rec  # return updated record
-
-            with ThreadPoolExecutor(max_workers=MAX_RENDER_WORKERS) as pool:  # Playwright pool
-                futures = {pool.submit(render_one, rec): rec for rec in pending_render}  # submit renders
-                for fut in as_completed(futures):  # as each finishes
-                    try:
-                        rec = fut.result()
-                    except Exception as e:
-                        rec = {
-                            "url": "<unknown>",
-                            "status": "failed",
-                            "type": None,
-                            "saved": None,
-                            "error": f"Render worker error: {repr(e)}",
-                        }
-                    if rec["status"] == "ok":
-                        print(f"ok           html_rendered  {rec['url']} -> {rec['saved']}")  # success log
-                    else:
-                        print(f"failed       -              {rec.get('url')} -> {rec.get('error')}")  # error log
-
-        manifest_path = base_dir / "fetch_manifest.json"  # manifest path
-        manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")  # save manifest
-        print(f"\nDone in {time.time() - start:0.2f}s. Manifest: {manifest_path}")  # final log
+        groups: dict[str, list[tuple[VendorJob, str]]] = defaultdict(list)  # bare form -> (vendor, URL)
+        for job in jobs:
+            for u in job.urls:
+                groups[job.bare_forms.get(u, u)].append((job, u))
+        reused_bares: set[str] = set()  # groups linked from an earlier run's fetch
+        tasks = [  # schedule all; the scheduler decides when each one actually goes out
+            asyncio.create_task(fetch_group(bare, members)) for bare, members in groups.items()
+        ]
+        try:
+            for fut in asyncio.as_completed(tasks):  # as each group finishes
+                for job, rec in await fut:  # get records
+                    job.log.append(rec)  # persist progress immediately
+                    print(f"{rec['status']:12} {rec.get('type') or '-':12} {rec.get('url')} -> {rec.get('saved')}")
+        finally:
+            store.save()  # keep validators/blobs index even after a crash
+
+    if store.unchanged:
+        print(f"\nUnchanged since last run (304, not re-downloaded): {store.unchanged}")
+    reused = sum(len(groups[bare]) for bare in reused_bares)
+    if reused:
+        print(f"Fetched in an earlier run (linked from the store, no request): {reused}")
+    shared = sum(len(members) - 1 for bare, members in groups.items() if bare not in reused_bares)
+    if shared:
+        print(f"Shared across vendors (fetched once, linked): {shared}")
+    tripped = {h.name for h in scheduler.hosts.values() if h.is_open}
+    if tripped:
+        print(f"\nCircuit open (failed fast) for: {', '.join(sorted(tripped))}")
+        for job in jobs:
+            for rec in [r for r in job.pending_render if scheduler.host_for(r["url"]).name in tripped]:
+                rec["status"] = "failed"  # dead host: rendering would only time out again
+                job.pending_render.remove(rec)
+                job.log.append(rec)
+
+
+async def run_render_phase(jobs: list[VendorJob], config: FetchConfig, store: BlobStore) -> None:
+    """Render every vendor's pending records through one RenderService, updating records in place."""
+    async with RenderService(
+        store, config.render_browsers, config.pages_per_browser, config.recycle_after, config.render_mode
+    ) as service:
+
+        async def render_one(job: VendorJob, rec: dict) -> tuple[VendorJob, dict]:
+            """Helper to render one pending URL."""
+            started = time.perf_counter()
+            try:
+                rec["saved"] = await service.render(rec["url"], job.pages_dir)  # try render
+                rec["type"] = "html_rendered"
+                rec["status"] = "ok"
+                rec["error"] = None
+            except Exception as e:
+                rec["status"] = "failed"
+                rec["error"] = repr(e)
+            rec.setdefault("timings", {})["render"] = round(time.perf_counter() - started, 4)
+            return job, rec  # return updated record
+
+        renders = [render_one(job, rec) for job in jobs for rec in job.pending_render]
+        try:
+            for fut in asyncio.as_completed(renders):  # as each finishes
+                job, rec = await fut
+                job.log.append(rec)  # persist the render outcome
+                if rec["status"] == "ok":
+                    print(f"ok           html_rendered  {rec['url']} -> {rec['saved']}")  # success log
+                else:
+                    print(f"failed       -              {rec.get('url')} -> {rec.get('error')}")  # error log
+        finally:
+            store.save()  # rendered pages are blobs too
+        print(f"Browser launches: {service.launches}")
+
+
+async def run_jobs(jobs: list[VendorJob], config: FetchConfig, store: BlobStore) -> None:
+    """Phase 1 (HTTP) for all jobs, then phase 2 (renders) for whatever is still pending."""
+    await run_http_phase(jobs, config, store)
+    pending = sum(len(job.pending_render) for job in jobs)
+    if PLAYWRIGHT_AVAILABLE and pending:
+        print(
+            f"\nRendering {pending} URLs via Playwright "
+            f"({config.render_browsers} browsers x {config.pages_per_browser} pages at a time, "
+            f"{config.render_mode} mode)..."
+        )
+        await run_render_phase(jobs, config, store)
+
+
+def record_fetches(index_path: Path, jobs: list[VendorJob], store: BlobStore) -> None:
+    """Write this run's outcome per bare URL (one row per actual fetch) to the cross-vendor index."""
+    results = []
+    for job in jobs:
+        for url, rec in job.log.touched.items():
+            bare = job.bare_forms.get(url)
+            if bare and "shared_from" not in rec:
+                entry = store.cached(url) if rec["status"] == "ok" else None
+                results.append((bare, url, job.vendor, rec, entry["sha256"] if entry else None))
+    with GlobalUrlIndex(index_path) as index:
+        index.record_fetches(results)
+
+
+def fetch_folders(base_dirs: list[Path], config: FetchConfig) -> None:
+    """
+    Fetch one or more vendor folders through one shared client, scheduler,
+    store and render pool. A folder that cannot be loaded is reported and skipped.
+    """
+    jobs: list[VendorJob] = []
+    for base_dir in base_dirs:
+        try:
+            jobs.append(prepare_vendor(base_dir, config))
+        except Exception as e:
+            print(f"Skipping {base_dir}: {e}")
+    if not jobs:
+        return
+
+    store_root = config.store_dir or jobs[0].base_dir.resolve().parent / STORE_DIR_NAME
+    store = BlobStore(store_root)  # shared download store
+    index_path = config.url_index or jobs[0].base_dir.resolve().parent / INDEX_FILE_NAME
+    if index_path.exists():
+        with GlobalUrlIndex(index_path) as index:
+            for job in jobs:
+                job.bare_forms = {clean_url(o): bare for o, bare in index.bare_forms(job.vendor).items()}
+                job.earlier = index.earlier_fetches(job.vendor)
+    else:
+        index_path = None  # dedup scripts have not built one; fetch per vendor
+    start = time.time()  # start timer
+    try:
+        asyncio.run(run_jobs(jobs, config, store))
+    finally:
+        if index_path:
+            record_fetches(index_path, jobs, store)
+        print()
+        for job in jobs:
+            manifest_path = finish_vendor(job)  # manifest even after Ctrl-C/crash
+            statuses = [r.get("status") for r in job.log.records.values()]
+            print(
+                f"{job.vendor}: ok {statuses.count('ok')}/{job.total}, "
+                f"failed {statuses.count('failed')} | manifest: {manifest_path}"
+            )
+    run_records = [rec for job in jobs for rec in job.log.touched.values()]
+    if run_records:
+        print_stats(build_stats(run_records))
+    print(f"\nDone in {time.time() - start:0.2f}s.")  # final log
+
+
+def main(base_dir: Path, config: FetchConfig | None = None) -> None:
+    """
+    Orchestrate the full fetch for one vendor folder:
+    - Load deduplicated.json.
+    - Concurrent async HTTP fetches (files/raw HTML), polite per host.
+    - Pooled Playwright renders for pending URLs.
+    - Append each finished record to fetch_manifest.jsonl; write fetch_manifest.json at the end.
+    """
+    config = config or FetchConfig()
+    try:
+        # Check basic internet connectivity before doing heavy work.
+        if not check_connectivity():
+            print("Warning: Internet connectivity check failed (google.com unreachable). Continuing anyway...")
+
+        if not (base_dir / "deduplicated.json").exists():
+            raise SystemExit(f"deduplicated.json not found at {base_dir / 'deduplicated.json'}")  # fail if missing
+        fetch_folders([base_dir], config)
     except Exception as e:
         # Catch any unexpected top-level error and print it clearly.
         print(f"Fatal error: {e}")
 
 
+def main_batch(data_root: Path, config: FetchConfig | None = None) -> None:
+    """
+    Fetch every vendor folder under data_root (each `*/deduplicated.json`) in one run:
+    one shared worker pool with global and per-host limits, per-vendor
+    files/, web pages/ and manifests, and one download store for all.
+    """
+    config = config or FetchConfig()
+    try:
+        if not check_connectivity():
+            print("Warning: Internet connectivity check failed (google.com unreachable). Continuing anyway...")
+
+        base_dirs = sorted(p.parent for p in data_root.glob("*/deduplicated.json"))  # vendor folders
+        if not base_dirs:
+            raise SystemExit(f"No '*/deduplicated.json' found under {data_root}")
+        print(f"Batch fetch: {len(base_dirs)} vendor folders under {data_root}")
+        fetch_folders(base_dirs, config)
+    except Exception as e:
+        print(f"Fatal error: {e}")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fetch links from deduplicated.json")  # CLI parser
     parser.add_argument(
@@ -289,5 +1587,136 @@ if __name__ == "__main__":
         default=Path("."),
         help="Directory containing deduplicated.json (default: current directory)",
     )
+    parser.add_argument(
+        "--data-root",
+        type=Path,
+        default=None,
+        help="Batch mode: fetch every */deduplicated.json under this folder through one shared pool",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=MAX_HTTP_CONCURRENCY,
+        help=f"Max HTTP requests in flight at once (default: {MAX_HTTP_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Negotiate HTTP/2 where servers support it (needs the 'h2' package)",
+    )
+    parser.add_argument(
+        "--per-host",
+        type=int,
+        default=PER_HOST_CONCURRENCY,
+        help=f"Max requests in flight to one host; halves on 429/503 (default: {PER_HOST_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--host-rate",
+        type=float,
+        default=PER_HOST_RATE,
+        help=f"Requests per second per host, 0 for no limit (default: {PER_HOST_RATE})",
+    )
+    parser.add_argument(
+        "--host-burst",
+        type=int,
+        default=PER_HOST_BURST,
+        help=f"Burst size above the per-host rate (default: {PER_HOST_BURST})",
+    )
+    parser.add_argument(
+        "--breaker-threshold",
+        type=int,
+        default=BREAKER_THRESHOLD,
+        help=f"Consecutive connect errors before a host's links fail fast (default: {BREAKER_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=MAX_RETRIES,
+        help=f"Retries for 429/503 responses, honouring Retry-After (default: {MAX_RETRIES})",
+    )
+    run_mode = parser.add_mutually_exclusive_group()
+    run_mode.add_argument(
+        "--resume",
+        action="store_const",
+        const="resume",
+        dest="run_mode",
+        help=f"Skip URLs already 'ok' in {MANIFEST_LOG_NAME}; fetch the rest",
+    )
+    run_mode.add_argument(
+        "--retry-failed",
+        action="store_const",
+        const="retry-failed",
+        dest="run_mode",
+        help=f"Only re-queue URLs recorded as failed/pending_render in {MANIFEST_LOG_NAME}",
+    )
+    parser.add_argument(
+        "--url-index",
+        type=Path,
+        default=None,
+        help=f"Cross-vendor URL index from the dedup scripts (default: <data folder>/{INDEX_FILE_NAME} if present)",
+    )
+    parser.add_argument(
+        "--max-file-mb",
+        type=float,
+        default=MAX_FILE_SIZE / 2**20,
+        help=f"Per-file size cap in MiB, 0 for none (default: {MAX_FILE_SIZE // 2**20})",
+    )
+    parser.add_argument(
+        "--range-connections",
+        type=int,
+        default=RANGE_CONNECTIONS,
+        help=f"Parallel range requests per large file, 1 to disable (default: {RANGE_CONNECTIONS})",
+    )
+    parser.add_argument(
+        "--store-dir",
+        type=Path,
+        default=None,
+        help=f"Content-addressed download store (default: {STORE_DIR_NAME} next to the vendor folder)",
+    )
+    parser.add_argument(
+        "--render-browsers",
+        type=int,
+        default=RENDER_BROWSERS,
+        help=f"Chromium processes kept alive for renders (default: {RENDER_BROWSERS})",
+    )
+    parser.add_argument(
+        "--pages-per-browser",
+        type=int,
+        default=PAGES_PER_BROWSER,
+        help=f"Concurrent pages per browser (default: {PAGES_PER_BROWSER})",
+    )
+    parser.add_argument(
+        "--recycle-after",
+        type=int,
+        default=RECYCLE_AFTER_PAGES,
+        help=f"Relaunch a browser after this many pages (default: {RECYCLE_AFTER_PAGES})",
+    )
+    parser.add_argument(
+        "--render-mode",
+        choices=RENDER_MODES,
+        default="lean",
+        help="lean: block images/fonts/trackers, DOM-ready + bounded idle; full: load everything (default: lean)",
+    )
     args = parser.parse_args()  # parse args
-    main(args.base_dir)  # run main with provided base dir
+    config = FetchConfig(
+        concurrency=args.concurrency,
+        http2=args.http2,
+        per_host=args.per_host,
+        host_rate=args.host_rate,
+        host_burst=args.host_burst,
+        breaker_threshold=args.breaker_threshold,
+        max_retries=args.max_retries,
+        render_browsers=args.render_browsers,
+        pages_per_browser=args.pages_per_browser,
+        recycle_after=args.recycle_after,
+        render_mode=args.render_mode,
+        store_dir=args.store_dir,
+        run_mode=args.run_mode or "fresh",
+        max_file_size=int(args.max_file_mb * 2**20),
+        range_connections=args.range_connections,
+        url_index=args.url_index,
+    )
+    if args.data_root is not None:
+        main_batch(args.data_root, config)  # all vendor folders at once
+    else:
+        main(args.base_dir, config)  # run main with provided options
@@ -0,0 +1,221 @@
+"""
+Content-addressed download store shared by fetch runs.
+
+Overall goal (plain English)
+- Every downloaded body is saved once, under its SHA-256, in <store>/blobs.
+- A URL index (<store>/url_index.json) remembers which blob each URL gave us,
+  plus the ETag/Last-Modified the server sent, so the next run can ask
+  "has it changed?" (If-None-Match / If-Modified-Since) and skip the body.
+- Vendor folders keep human-readable names (files/brochure.pdf,
+  web pages/index.html) that are hard links to the blobs (copies where the
+  filesystem cannot link). The same PDF cited by several vendors is stored once.
+
+Where it fits
+- fetch_links.py opens one BlobStore per run (default: a `.fetch_store`
+  folder next to the vendor folders) and routes every save through it.
+"""
+
+from __future__ import annotations
+
+import hashlib  # SHA-256 content addresses
+import json  # read/write the URL index
+import os  # hard links and atomic renames
+import shutil  # copy fallback when hard links are not possible
+import time  # record when a URL was fetched
+import uuid  # unique temp file names
+from pathlib import Path  # handle file system paths
+
+# File name of the URL -> blob index inside the store.
+INDEX_NAME = "url_index.json"
+# Write buffer for blob temp files (fewer syscalls on big downloads).
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class BlobWriter:
+    """Temp file that hashes bytes as they are written; committed into the store by hash."""
+
+    def __init__(self, tmp_path: Path) -> None:
+        self.tmp_path = tmp_path
+        self.size = 0  # bytes written so far
+        self._hash = hashlib.sha256()
+        self._file = open(tmp_path, "wb", buffering=WRITE_BUFFER_SIZE)
+
+    def write(self, data: bytes) -> None:
+        """Append bytes to the temp file and the running hash."""
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+
+    def close(self) -> None:
+        """Close the temp file (safe to call twice)."""
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self) -> None:
+        """Drop a half-written body (failed download)."""
+        self.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+    @property
+    def sha256(self) -> str:
+        """Hex digest of everything written."""
+        return self._hash.hexdigest()
+
+
+class BlobStore:
+    """
+    Blobs keyed by SHA-256 plus a URL index with HTTP validators.
+    - `writer()` / `commit()` store a streamed body once, whatever URL it came from.
+    - `conditional_headers(url)` builds If-None-Match / If-Modified-Since for re-fetches.
+    - `link()` exposes a blob under a readable name in a vendor folder; two
+      different URLs that want the same name in the same folder get distinct
+      names (a short URL hash is appended to the later one).
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.blobs_dir = root / "blobs"
+        self.tmp_dir = root / "tmp"
+        self.index_path = root / INDEX_NAME
+        self.blobs_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.index: dict[str, dict] = {}  # url -> entry
+        if self.index_path.exists():
+            self.index = json.loads(self.index_path.read_text(encoding="utf-8"))
+        self._claimed: dict[Path, str] = {}  # vendor path -> URL that owns it this run
+        self._seeded: set[Path] = set()  # vendor folders whose existing names are claimed
+        self.unchanged = 0  # URLs answered 304 this run
+
+    def save(self) -> None:
+        """Write the URL index atomically."""
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.index, indent=2), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+
+    def blob_path(self, sha256: str) -> Path:
+        """Path of a blob (two-level fan-out keeps directories small)."""
+        return self.blobs_dir / sha256[:2] / sha256
+
+    def cached(self, url: str) -> dict | None:
+        """Index entry for a URL whose blob is still on disk, else None."""
+        entry = self.index.get(url)
+        if entry and self.blob_path(entry["sha256"]).exists():
+            return entry
+        return None
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        """Validators from the last successful fetch of this URL."""
+        entry = self.cached(url)
+        headers: dict[str, str] = {}
+        if entry:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def writer(self) -> BlobWriter:
+        """Start a new body; call commit() when it is complete or discard() on failure."""
+        return BlobWriter(self.tmp_dir / f"{uuid.uuid4().hex}.part")
+
+    def commit(self, writer: BlobWriter) -> str:
+        """Move a finished body into blobs/ (dropping it if the same content exists) and return its hash."""
+        writer.close()
+        self._adopt(writer.tmp_path, writer.sha256)
+        return writer.sha256
+
+    def part_path(self, url: str) -> Path:
+        """Stable `.part` path for a URL, so an interrupted large download can resume next run."""
+        return self.tmp_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.part"
+
+    def commit_file(self, path: Path) -> tuple[str, int]:
+        """Hash a finished file (e.g. a completed .part), move it into blobs/, return (hash, size)."""
+        digest = hashlib.sha256()
+        size = 0
+        with open(path, "rb") as f:
+            while chunk := f.read(WRITE_BUFFER_SIZE):
+                digest.update(chunk)
+                size += len(chunk)
+        sha256 = digest.hexdigest()
+        self._adopt(path, sha256)
+        return sha256, size
+
+    def _adopt(self, tmp_path: Path, sha256: str) -> None:
+        """Rename tmp_path to its blob path, or drop it if that content is already stored."""
+        target = self.blob_path(sha256)
+        if target.exists():
+            tmp_path.unlink(missing_ok=True)  # same bytes already stored
+        else:
+            target.parent.mkdir(exist_ok=True)
+            os.replace(tmp_path, target)
+
+    def remember(self, url: str, sha256: str, headers, kind: str, name: str, size: int) -> None:
+        """Record which blob a URL produced, with its validators and readable name."""
+        self.index[url] = {
+            "sha256": sha256,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "content_type": headers.get("Content-Type"),
+            "kind": kind,
+            "name": name,
+            "size": size,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+
+    def _seed_claims(self, target_dir: Path) -> None:
+        """
+        Claim the files earlier runs linked into target_dir for the URLs that own them,
+        so a name stays with its URL whatever order this run fetches in.
+        """
+        if target_dir in self._seeded:
+            return
+        self._seeded.add(target_dir)
+        if not target_dir.is_dir():
+            return
+        by_name: dict[str, list[str]] = {}  # indexed name -> URLs
+        for url, entry in self.index.items():
+            by_name.setdefault(entry["name"], []).append(url)
+        for path in target_dir.iterdir():
+            urls = by_name.get(path.name)
+            if not urls or path in self._claimed:
+                continue
+            owner = urls[0]
+            for url in urls[1:]:  # same name in several folders: the URL whose blob this is
+                try:
+                    if os.path.samefile(path, self.blob_path(self.index[url]["sha256"])):
+                        owner = url
+                        break
+                except OSError:
+                    pass
+            self._claimed[path] = owner
+
+    def link(self, sha256: str, target_dir: Path, name: str, url: str) -> Path:
+        """
+        Expose a blob as target_dir/name and return the path.
+        - A URL that already has a file here (from an earlier run) keeps that name,
+          so re-runs replace in place instead of leaving the old file behind.
+        - If another URL owns the name, appends a short URL hash.
+        """
+        self._seed_claims(target_dir)
+        entry = self.index.get(url)
+        if entry and self._claimed.get(target_dir / entry["name"]) == url:
+            name = entry["name"]  # keep the name an earlier run gave this URL
+        target = target_dir / name
+        owner = self._claimed.get(target)
+        if owner is not None and owner != url:
+            url_tag = hashlib.sha1(url.encode("utf-8")).hexdigest()[:8]
+            target = target_dir / f"{target.stem}-{url_tag}{target.suffix}"
+        self._claimed[target] = url
+        blob = self.blob_path(sha256)
+        if target.exists() or target.is_symlink():
+            try:
+                if os.path.samefile(target, blob):
+                    return target  # already linked to this blob
+            except OSError:
+                pass
+            target.unlink()
+        try:
+            os.link(blob, target)  # no extra disk space
+        except OSError:
+            shutil.copyfile(blob, target)  # e.g. store on another drive
+        return target
@@ -0,0 +1,128 @@
+"""
+Cross-vendor URL index (SQLite) shared by the dedup and fetch scripts.
+
+Overall goal (plain English)
+- The same FDA page or RSNA article is cited by many vendors. Per-folder dedup
+  cannot see that; this index can.
+- `links`: every link of every vendor (vendor folder, link key, original form,
+  bare-minimum form, selected flag). The dedup scripts replace a vendor's rows
+  each time they process its folder.
+- `fetches`: the latest fetch result per bare-minimum form (status, type,
+  stored blob hash). fetch_links writes it after a run and reads it on the
+  next one, so a bare URL fetched earlier (for any vendor) is linked from the
+  store instead of being downloaded again.
+
+Where it fits
+- deduplicate_sources*.py keep `<data-dir>/global_url_index.sqlite` up to date.
+- fetch_links.py reads it to fetch each bare URL once per run and link the
+  result into every vendor that cites it.
+- WAL mode plus a busy timeout lets the dedup workers (--jobs) write concurrently.
+"""
+
+from __future__ import annotations
+
+import sqlite3  # stdlib SQLite driver
+import time  # timestamps for fetch results
+from pathlib import Path  # handle file system paths
+from typing import Iterable  # row iterators
+
+# Default index file name, created in the data directory.
+INDEX_FILE_NAME = "global_url_index.sqlite"
+# Seconds a writer waits for another process's transaction before failing.
+BUSY_TIMEOUT = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS links (
+    vendor TEXT NOT NULL,
+    link_key TEXT NOT NULL,
+    original TEXT NOT NULL,
+    bare TEXT NOT NULL,
+    selected INTEGER NOT NULL,
+    PRIMARY KEY (vendor, link_key)
+);
+CREATE INDEX IF NOT EXISTS links_bare ON links (bare);
+CREATE TABLE IF NOT EXISTS fetches (
+    bare TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    vendor TEXT NOT NULL,
+    status TEXT,
+    type TEXT,
+    sha256 TEXT,
+    error TEXT,
+    fetched_at TEXT NOT NULL
+);
+"""
+
+
+def index_rows(dictionary1: dict[str, dict]) -> Iterable[tuple[str, str, str, int]]:
+    """(link key, original form, bare form, selected) for every entry of a dictionary1."""
+    for key, entry in dictionary1.items():
+        yield key, entry["original form"], entry["bare minimum form"], entry["selected"]
+
+
+class GlobalUrlIndex:
+    """Thin wrapper over the SQLite file; use as a context manager."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # readers never block the writer
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> GlobalUrlIndex:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection."""
+        self.conn.close()
+
+    def replace_vendor(self, vendor: str, rows: Iterable[tuple[str, str, str, int]]) -> None:
+        """Swap in a vendor's current links in one transaction (rows may be a generator)."""
+        with self.conn:
+            self.conn.execute("DELETE FROM links WHERE vendor = ?", (vendor,))
+            self.conn.executemany(
+                "INSERT INTO links (vendor, link_key, original, bare, selected) VALUES (?, ?, ?, ?, ?)",
+                ((vendor, *row) for row in rows),
+            )
+
+    def has_vendor(self, vendor: str) -> bool:
+        """True if the vendor has rows (e.g. the index file was not deleted since)."""
+        return self.conn.execute("SELECT 1 FROM links WHERE vendor = ? LIMIT 1", (vendor,)).fetchone() is not None
+
+    def bare_forms(self, vendor: str) -> dict[str, str]:
+        """Original form -> bare form for the vendor's selected links."""
+        rows = self.conn.execute("SELECT original, bare FROM links WHERE vendor = ? AND selected = 1", (vendor,))
+        return dict(rows.fetchall())
+
+    def shared(self, min_vendors: int = 2) -> list[tuple[str, int]]:
+        """Bare forms cited by at least `min_vendors` vendors, most cited first."""
+        rows = self.conn.execute(
+            "SELECT bare, COUNT(DISTINCT vendor) AS n FROM links GROUP BY bare HAVING n >= ? ORDER BY n DESC, bare",
+            (min_vendors,),
+        )
+        return rows.fetchall()
+
+    def earlier_fetches(self, vendor: str) -> dict[str, tuple[str, str]]:
+        """Bare form -> (fetched URL, blob hash) of earlier successful fetches of the vendor's selected links."""
+        rows = self.conn.execute(
+            "SELECT DISTINCT f.bare, f.url, f.sha256 FROM fetches AS f JOIN links AS l ON l.bare = f.bare "
+            "WHERE l.vendor = ? AND l.selected = 1 AND f.status = 'ok' AND f.sha256 IS NOT NULL",
+            (vendor,),
+        )
+        return {bare: (url, sha256) for bare, url, sha256 in rows.fetchall()}
+
+    def record_fetches(self, results: Iterable[tuple[str, str, str, dict, str | None]]) -> None:
+        """Store (bare, url, vendor, manifest record, blob hash) fetch outcomes, newest wins."""
+        fetched_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO fetches (bare, url, vendor, status, type, sha256, error, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (bare, url, vendor, rec.get("status"), rec.get("type"), sha256, rec.get("error"), fetched_at)
+                    for bare, url, vendor, rec, sha256 in results
+                ),
+            )
@@ -0,0 +1,215 @@
+"""
+Overview
+--------
+Second-stage near-duplicate report over the dedup output (dictionary1.json).
+Exact grouping on the bare-minimum form misses links such as:
+  - double-percent-encoded URLs (`FOI%252025-0127` next to `FOI%2025-0127`),
+  - paths that differ only in letter case, or reordered query parameters,
+  - one document mirrored as a PDF and an HTML page with near-identical summaries.
+
+This script never changes dictionary1.json / deduplicated.json. It writes
+`near_duplicates.json` next to them with candidate groups and scores, for a
+human (or a later rule change) to decide on.
+
+How it works
+------------
+1. Canonical URLs: each bare form is fully percent-decoded, its path lowercased
+   and its query parameters sorted (url_normalize.canonical_form). Bare forms
+   that meet on the same canonical URL are reported with score 1.0.
+2. Summaries: every canonical URL's longest "accompanying RAG summary" is split
+   into word shingles and reduced to a MinHash signature. LSH banding puts
+   similar signatures in shared buckets; each item is only compared with the
+   first item of each bucket it lands in, so the pass stays near-linear in the
+   number of links. Pairs whose estimated Jaccard similarity reaches
+   --threshold are joined into groups, reported with each member's similarity
+   to the group's first member.
+   (Summaries are empty in the plain deduplicate_sources.py output; run
+   deduplicate_sources_with_summaries.py first to get summary groups.)
+
+Usage
+-----
+    python near_duplicates.py [--data-dir .] [--threshold 0.8]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import zlib
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+from url_normalize import canonical_form
+
+REPORT_NAME = "near_duplicates.json"
+# Words per shingle.
+SHINGLE_WORDS = 3
+# Summaries with fewer words than this are too short to compare meaningfully.
+MIN_SUMMARY_WORDS = 8
+# MinHash permutations = LSH bands x rows per band.
+NUM_PERM = 128
+LSH_BANDS = 32
+# Prime modulus for the (a * x + b) mod p hash family (31-bit, so products fit in uint64).
+HASH_PRIME = (1 << 31) - 1
+# Fixed seed: the same input always gives the same report.
+MINHASH_SEED = 1729
+DEFAULT_THRESHOLD = 0.8
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def shingle_hashes(text: str) -> np.ndarray | None:
+    """31-bit hashes of the word 3-grams of `text`, or None if it is too short."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < MIN_SUMMARY_WORDS:
+        return None
+    shingles = {" ".join(words[i : i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    hashes = (zlib.crc32(s.encode("utf-8")) & HASH_PRIME for s in shingles)
+    return np.fromiter(hashes, dtype=np.uint64, count=len(shingles))
+
+
+class MinHasher:
+    """NUM_PERM hash functions h(x) = (a * x + b) mod p; a signature is the per-function minimum."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = MINHASH_SEED) -> None:
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, HASH_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.b = rng.integers(0, HASH_PRIME, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, hashes: np.ndarray) -> np.ndarray:
+        """MinHash signature of one shingle set."""
+        return ((self.a * hashes[None, :] + self.b) % HASH_PRIME).min(axis=1)
+
+
+def similarity(sig1: np.ndarray, sig2: np.ndarray) -> float:
+    """Estimated Jaccard similarity: share of matching signature slots."""
+    return float(np.count_nonzero(sig1 == sig2)) / len(sig1)
+
+
+def find_root(parent: list[int], i: int) -> int:
+    """Union-find root with path halving."""
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def lsh_groups(signatures: list[np.ndarray], threshold: float, bands: int = LSH_BANDS) -> list[list[int]]:
+    """
+    Group signature indices whose estimated similarity reaches `threshold`.
+    - Each band of each signature is a bucket key; an item is compared only with the
+      first item already in that bucket (O(items x bands) comparisons in total).
+    - Groups are returned in order of their first member, members in index order.
+    """
+    rows = len(signatures[0]) // bands if signatures else 0
+    buckets: dict[tuple[int, bytes], int] = {}
+    parent = list(range(len(signatures)))
+    for idx, sig in enumerate(signatures):
+        for band in range(bands):
+            key = (band, sig[band * rows : (band + 1) * rows].tobytes())
+            first = buckets.setdefault(key, idx)
+            if first == idx:
+                continue
+            root_first, root_idx = find_root(parent, first), find_root(parent, idx)
+            if root_first != root_idx and similarity(signatures[first], sig) >= threshold:
+                parent[max(root_first, root_idx)] = min(root_first, root_idx)
+    members: dict[int, list[int]] = defaultdict(list)
+    for idx in range(len(signatures)):
+        members[find_root(parent, idx)].append(idx)
+    return [group for _, group in sorted(members.items()) if len(group) > 1]
+
+
+def near_duplicate_report(dictionary1: dict[str, dict], threshold: float = DEFAULT_THRESHOLD) -> dict:
+    """Build the report for one dictionary1 (see the module docstring)."""
+    # One unit per canonical URL: its links, bare forms and longest summary.
+    units: dict[str, dict] = {}
+    for key, entry in dictionary1.items():
+        bare = entry["bare minimum form"]
+        unit = units.setdefault(canonical_form(bare), {"links": [], "bare_forms": [], "summary": ""})
+        unit["links"].append(key)
+        if bare not in unit["bare_forms"]:
+            unit["bare_forms"].append(bare)
+        summary = entry.get("accompanying RAG summary + metadata string") or ""
+        if len(summary) > len(unit["summary"]):
+            unit["summary"] = summary
+
+    url_groups = [
+        {"canonical": canonical, "score": 1.0, "bare_forms": unit["bare_forms"], "links": unit["links"]}
+        for canonical, unit in units.items()
+        if len(unit["bare_forms"]) > 1
+    ]
+
+    hasher = MinHasher()
+    names: list[str] = []
+    signatures: list[np.ndarray] = []
+    for canonical, unit in units.items():
+        hashes = shingle_hashes(unit["summary"])
+        if hashes is not None:
+            names.append(canonical)
+            signatures.append(hasher.signature(hashes))
+    summary_groups = []
+    for group in lsh_groups(signatures, threshold):
+        anchor = signatures[group[0]]
+        members = [
+            {
+                "canonical": names[i],
+                "similarity": round(similarity(anchor, signatures[i]), 3),
+                "bare_forms": units[names[i]]["bare_forms"],
+                "links": units[names[i]]["links"],
+            }
+            for i in group
+        ]
+        summary_groups.append({"score": min(m["similarity"] for m in members[1:]), "members": members})
+
+    return {
+        "params": {
+            "threshold": threshold,
+            "num_perm": NUM_PERM,
+            "bands": LSH_BANDS,
+            "shingle_words": SHINGLE_WORDS,
+        },
+        "links": len(dictionary1),
+        "canonical_urls": len(units),
+        "summaries_compared": len(signatures),
+        "url_groups": url_groups,
+        "summary_groups": summary_groups,
+    }
+
+
+def main() -> None:
+    """Entry point: write near_duplicates.json next to every dictionary1.json under data-dir."""
+    parser = argparse.ArgumentParser(description="Report near-duplicate links in dedup output (nothing is merged).")
+    parser.add_argument(
+        "--data-dir",
+        type=Path,
+        default=Path("."),
+        help="Base directory containing subfolders with dictionary1.json files (default: current directory).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Minimum estimated summary similarity (Jaccard, 0-1) to report (default: {DEFAULT_THRESHOLD}).",
+    )
+    args = parser.parse_args()
+
+    inputs = sorted(args.data_dir.glob("*/dictionary1.json"))
+    if not inputs:
+        raise SystemExit("No 'dictionary1.json' files found; run a deduplicate_sources script first.")
+
+    for path in inputs:
+        print(f"Processing {path} ...")
+        dictionary1 = json.loads(path.read_text(encoding="utf-8"))
+        report = near_duplicate_report(dictionary1, args.threshold)
+        output = path.with_name(REPORT_NAME)
+        output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(
+            f"  canonical URL groups: {len(report['url_groups'])} | "
+            f"summary groups: {len(report['summary_groups'])} | output: {output}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Shared URL normalizer for the dedup scripts.
+
+Overall goal (plain English)
+- Turn every way an LLM writes a link (`**www.x.com/a/**`, `https://x.com/a?utm_source=y`,
+  `x.com:443/a`) into one "bare minimum" string, so duplicates group together.
+- The same raw strings repeat a lot across LLM outputs, so results are kept in a
+  bounded LRU cache keyed by the raw string.
+- Host aliases and tracking-parameter rules live in url_rules.json (next to this
+  file), loaded once; changing them needs no code edits.
+
+Where it fits
+- deduplicate_sources.py and deduplicate_sources_with_summaries.py import
+  `normalize_url` from here; `--url-rules` on either script points `configure()`
+  at another rules file.
+"""
+
+from __future__ import annotations
+
+import hashlib  # fingerprint the rules file
+import json  # read the rules file
+import re  # precompiled cleanup patterns
+from dataclasses import dataclass  # immutable rule set
+from functools import lru_cache  # memoize normalized URLs
+from pathlib import Path  # handle file system paths
+from urllib.parse import unquote, urlparse  # split URLs into parts / percent-decoding
+
+# Default rules file, shipped next to this module.
+RULES_PATH = Path(__file__).with_name("url_rules.json")
+# Distinct raw URL strings kept in the normalization cache.
+CACHE_SIZE = 65536
+# Bump whenever normalize_url changes behaviour (invalidates incremental dedup state).
+NORMALIZER_VERSION = 1
+
+# Percent-decoding rounds for canonical_form (enough for double/triple-encoded links).
+MAX_UNQUOTE_ROUNDS = 4
+
+# Patterns compiled once instead of per call.
+SCHEME_RE = re.compile(r"^[a-zA-Z][a-zA-Z0-9+.-]*://")  # has an explicit scheme
+SLASHES_RE = re.compile(r"/{2,}")  # duplicate slashes in paths
+
+
+@dataclass(frozen=True)
+class UrlRules:
+    """Host aliases (host -> canonical host), query keys to drop (by prefix), and a hash of the source file."""
+
+    host_aliases: dict[str, str]
+    tracking_prefixes: tuple[str, ...]
+    digest: str
+
+
+def load_rules(path: Path) -> UrlRules:
+    """Read a rules file: {"host_aliases": {...}, "tracking_param_prefixes": [...]}."""
+    raw = path.read_bytes()
+    data = json.loads(raw)
+    return UrlRules(
+        # Hosts are looked up lowercased, after one leading `www.` is stripped.
+        host_aliases={host.lower(): alias.lower() for host, alias in data.get("host_aliases", {}).items()},
+        tracking_prefixes=tuple(data.get("tracking_param_prefixes", [])),
+        digest=hashlib.sha256(raw).hexdigest(),
+    )
+
+
+_rules = load_rules(RULES_PATH)  # active rules
+
+
+def configure(path: Path) -> None:
+    """Switch to another rules file and drop results cached under the old rules."""
+    global _rules
+    _rules = load_rules(path)
+    normalize_url.cache_clear()
+
+
+def fingerprint() -> str:
+    """Identifies the active normalization (code version + rules file); changes when output may change."""
+    return f"{NORMALIZER_VERSION}:{_rules.digest[:16]}"
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_url(url: str) -> str:
+    """Return a bare-minimum form of the URL for duplicate detection."""
+    # Strip surrounding markdown emphasis (e.g., **url** or *url*), then trailing punctuation.
+    candidate = url.strip().lstrip("*_").rstrip("*_")
+    candidate = candidate.rstrip(").,;")
+    # Ensure a scheme exists for urlparse.
+    if not SCHEME_RE.match(candidate):
+        candidate = f"http://{candidate}"
+
+    # Parse and normalize host/path/query.
+    try:
+        parsed = urlparse(candidate)
+    except ValueError:
+        # Handle malformed URLs (e.g., stray brackets) by stripping brackets and retrying.
+        candidate_fallback = candidate.strip("[]")
+        try:
+            parsed = urlparse(candidate_fallback)
+        except ValueError:
+            # If still invalid, return the cleaned candidate as-is to avoid crashes.
+            return candidate_fallback
+    netloc = parsed.netloc.lower()
+
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    netloc = _rules.host_aliases.get(netloc, netloc)
+
+    if netloc.endswith(":80"):
+        netloc = netloc[: -len(":80")]
+    if netloc.endswith(":443"):
+        netloc = netloc[: -len(":443")]
+
+    # Normalize path (collapse duplicate slashes, drop trailing slash).
+    path = SLASHES_RE.sub("/", parsed.path or "").rstrip("/")
+
+    # Strip tracking params; fragments are already dropped by not using them.
+    query = ""
+    if parsed.query:
+        kept = [
+            pair
+            for pair in parsed.query.split("&")
+            if pair and not pair.partition("=")[0].startswith(_rules.tracking_prefixes)
+        ]
+        # "key=" (empty value) is written back as bare "key", as before.
+        query = "&".join(pair[:-1] if pair.endswith("=") and pair.count("=") == 1 else pair for pair in kept)
+
+    normalized = netloc + path
+    if query:
+        normalized = f"{normalized}?{query}"
+
+    return normalized
+
+
+def fully_unquote(text: str) -> str:
+    """Percent-decode until nothing changes (FOI%252025 -> FOI%2025 -> FOI 25)."""
+    for _ in range(MAX_UNQUOTE_ROUNDS):
+        decoded = unquote(text)
+        if decoded == text:
+            break
+        text = decoded
+    return text
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonical_form(bare: str) -> str:
+    """
+    Looser key on top of a bare-minimum form, for near-duplicate candidates only:
+    fully percent-decoded, lowercase path, query parameters sorted.
+    - Not used for grouping in the dedup scripts: two links that only match here are
+      reported as candidates, never merged.
+    """
+    base, _, query = bare.partition("?")
+    host, slash, path = base.partition("/")
+    canonical = host + slash + fully_unquote(path).lower()
+    params = sorted(fully_unquote(pair) for pair in query.split("&") if pair)
+    if params:
+        canonical = f"{canonical}?{'&'.join(params)}"
+    return canonical